@@ -2,19 +2,27 @@ import pandas as pd
 import time
 from langchain.prompts import PromptTemplate
 from code.ToolContextDictionary import comprehensive_guide
-from code.traverse_helper import get_input_name, get_output_name
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
 from code.prompt_helper import _call_responses_api_from_prompt_template
 
 
-def create_tool_io_description(df_connections, tool_id):
+def create_tool_io_description(df_connections, tool_id, connection_index=None):
     """
     For a given tool_id, create a human-readable description of its inputs and outputs.
     
     Example output:
     "This tool receives data from tools 580 and 582, and produces output that will be used by subsequent tools."
+
+    Pass connection_index (from build_connection_index) when describing many tools to
+    avoid scanning df_connections once per tool.
     """
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
 
     num_inputs = len(input_details)
     num_outputs = len(output_details)
@@ -108,6 +116,7 @@ def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, mess
 
     results = []
     total_tools = len(df_nodes)  # This is now the filtered dataframe length
+    connection_index = build_connection_index(df_connections)
     progress_value = 0.0
     
     print(f"Processing {total_tools} tools for descriptions: {list(df_nodes['tool_id'])}")
@@ -126,7 +135,7 @@ def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, mess
         )
         
         # Create I/O context description
-        io_context = create_tool_io_description(df_connections, row["tool_id"])
+        io_context = create_tool_io_description(df_connections, row["tool_id"], connection_index)
 
         try:
             generated_description = _call_responses_api_from_prompt_template(
@@ -1,13 +1,20 @@
 # Print working directory
+import io
+import json
 import os
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 print(os.getcwd())
 
-from code.traverse_helper import get_input_name, get_output_name
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
 import pandas as pd
+import tiktoken
 from langchain.prompts import PromptTemplate
 from openai import OpenAI
 
+from code import llm_cache
 from code.ToolContextDictionary import comprehensive_guide
 
 # Use the new Responses API (v1/responses) for all models - supports Codex and chat models.
@@ -19,25 +26,98 @@ MODELS_WITHOUT_TEMPERATURE = frozenset((
 ))
 
 
-def _call_responses_api(model, temperature, input_text, instructions=None):
+def _responses_request_body(model, temperature, input_text):
+    body = {"model": model, "input": input_text}
+    # Only pass temperature for models that support it (Codex does not).
+    if temperature is not None and model not in MODELS_WITHOUT_TEMPERATURE:
+        body["temperature"] = temperature
+    return body
+
+
+def _call_responses_api(model, temperature, input_text, instructions=None, json_output=False):
     """
     Call OpenAI Responses API (v1/responses). Works with all models including Codex.
     Omits temperature for models that don't support it (e.g. Codex).
+    With json_output the model is constrained to answer with a JSON object.
     """
     client = OpenAI()
-    kwargs = {
-        "model": model,
-        "input": input_text,
-    }
+    kwargs = _responses_request_body(model, temperature, input_text)
     if instructions:
         kwargs["instructions"] = instructions
-    # Only pass temperature for models that support it (Codex does not).
-    if temperature is not None and model not in MODELS_WITHOUT_TEMPERATURE:
-        kwargs["temperature"] = temperature
+    if json_output:
+        kwargs["text"] = {"format": {"type": "json_object"}}
     response = client.responses.create(**kwargs)
     return (response.output_text or "").strip()
 
 
+def _batch_output_text(body):
+    """Concatenate the output_text parts of a raw Responses API JSON body."""
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output", [])
+        if item.get("type") == "message"
+        for part in item.get("content", [])
+        if part.get("type") == "output_text"
+    ).strip()
+
+
+def _run_responses_batch(model, temperature, prompts, on_poll=None, initial_poll=5.0, max_poll=60.0):
+    """
+    Run many Responses API requests through the OpenAI Batch API (half price, 24h window).
+
+    Parameters:
+        model (str): The LLM model to use.
+        temperature (float): Temperature parameter for LLM responses (omitted for models without it).
+        prompts (dict): custom_id (str) -> prompt input text.
+        on_poll (callable): Optional callback(completed, total) invoked after every status poll.
+        initial_poll (float): First polling interval in seconds; grows by 1.5x up to max_poll.
+        max_poll (float): Longest polling interval in seconds.
+
+    Returns:
+        dict: custom_id -> response text for the requests that succeeded. Failed or expired
+              requests are absent.
+    """
+    client = OpenAI()
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": _responses_request_body(model, temperature, prompt),
+        })
+        for custom_id, prompt in prompts.items()
+    ]
+    batch_file = client.files.create(
+        file=("batch_input.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+
+    delay = initial_poll
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_poll)
+        batch = client.batches.retrieve(batch.id)
+        if on_poll is not None and batch.request_counts is not None:
+            on_poll(batch.request_counts.completed, batch.request_counts.total)
+
+    results = {}
+    # Expired batches still return the requests that finished inside the window.
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = _batch_output_text(response.get("body") or {})
+    return results
+
+
 def _call_responses_api_from_prompt_template(prompt_template, model, temperature, **template_vars):
     """Format a PromptTemplate with template_vars and call the Responses API (input = full prompt)."""
     full_prompt = prompt_template.format(**template_vars)
@@ -45,7 +125,15 @@ def _call_responses_api_from_prompt_template(prompt_template, model, temperature
 import streamlit as st
 
 
-def create_tool_io_template(df_connections, tool_id):
+_ORDINAL_SUFFIXES = {1: "st", 2: "nd", 3: "rd"}
+
+
+def _ordinal(n):
+    # "1st", "2nd", "3rd", then "<n>th"; tools rarely have more than a few outputs.
+    return f"{n}{_ORDINAL_SUFFIXES.get(n, 'th')}"
+
+
+def create_tool_io_template(df_connections, tool_id, connection_index=None):
     """
     For a given tool_id, create a template string describing its inputs and outputs.
     The template will use get_input_name and get_output_name to obtain the names.
@@ -53,10 +141,18 @@ def create_tool_io_template(df_connections, tool_id):
     Example output:
     "This tool (tool id 583) has 2 input(s): df_580_Output connects to the 'Left', df_582_Output connects to the 'Right'.
      And the 1st output is df_583_Join."
+
+    Pass connection_index (from build_connection_index) when generating code for many tools to
+    avoid scanning df_connections once per tool.
     """
     # Use the helper functions to get input and output names
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
 
     num_inputs = len(input_details)
     # Build input details string
@@ -71,26 +167,117 @@ def create_tool_io_template(df_connections, tool_id):
     if num_outputs == 0:
         output_str = "No outputs"
     else:
-        output_str_list = []
-        for i, out in enumerate(output_details):
-            # Determine ordinal representation
-            if i == 0:
-                ordinal = "1st"
-            elif i == 1:
-                ordinal = "2nd"
-            elif i == 2:
-                ordinal = "3rd"
-            else:
-                ordinal = f"{ i +1}th"
-            output_str_list.append(f"name the {ordinal} output as {out}")
-        output_str = ", ".join(output_str_list)
+        output_str = ", ".join(
+            f"name the {_ordinal(i)} output as {out}" for i, out in enumerate(output_details, start=1)
+        )
 
     template_text = (f"This tool with id {tool_id} has {num_inputs} input(s), their variable name is {input_str}. Use {input_str} as the input for this tool "
                      f"And {output_str}.")
     return template_text
 
 
-def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0):
+# Minimum seconds between progress updates while code snippets complete.
+_UI_UPDATE_INTERVAL = 0.1
+
+# "Additional instructions" text of the per-tool code prompt, built once per tool type.
+_ADDITIONAL_INSTRUCTIONS = {
+    tool_name: f'Refer to this additional information for "{tool_name}" tool - {guide}'
+    for tool_name, guide in comprehensive_guide.items()
+}
+
+
+# Code prompt for several tools in one request. Each distinct tool guide is included once,
+# and the answer is a JSON object so the snippets can be split back per tool reliably.
+_PACKED_TEMPLATE = """
+    You are an expert data engineer. Convert each of the following Alteryx tool configurations into equivalent Python code using open-source libraries.
+    In the <DefaultAnnotationText> element, there is a text field that contains the high level description of the tool but it could be empty. You can keep it as comment in the code.
+
+    Rules:
+    1. For each tool, return only the Python code that reproduces the functionality of this tool.
+    2. Include import statements as a comments.
+    3. Don't include any function definitions or docstrings.
+    4. Don't include sample data, just the code.
+
+    Return a JSON object of the form {{"tools": [{{"tool_id": "<tool id>", "python_code": "<code>"}}]}} with exactly one entry per tool.
+
+    Additional instructions: {guides}
+
+    Tools:
+    {tools_block}
+    """
+
+
+def _encoding_for(model):
+    # tiktoken does not know every model name (e.g. new releases); fall back to the gpt-4o encoding.
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _packed_tool_block(tool_id, fields):
+    return (f"### Tool {tool_id}\n"
+            f"Tool type: {fields['tool_type']}\n"
+            f"Configuration details: {fields['config_text']}\n"
+            f"I/O details: {fields['io_info']}")
+
+
+def pack_tools(tool_ids, tool_fields, model="gpt-4o", max_prompt_tokens=6000, max_tools=8):
+    """
+    Greedily split tools into groups that are sent to the LLM in one request each.
+
+    A tool joins the current group while the group's tool blocks plus its distinct tool
+    guides stay within max_prompt_tokens and the group has fewer than max_tools tools.
+    A tool that does not fit on its own ends up alone in its group.
+
+    Parameters:
+        tool_ids (list): Tool IDs, in the order the tools should be generated.
+        tool_fields (list[dict]): Per tool, the 'tool_type', 'config_text', 'io_info' and
+                                  'additional_instructions' prompt fields.
+        model (str): Model whose tokenizer the budget is measured in.
+        max_prompt_tokens (int): Token budget for the variable part of one request.
+        max_tools (int): Largest number of tools in one request.
+
+    Returns:
+        list[list[int]]: Groups of positions into tool_ids.
+    """
+    encoding = _encoding_for(model)
+    guide_tokens = {}
+    groups, group, used, guides = [], [], 0, set()
+    for n, (tool_id, fields) in enumerate(zip(tool_ids, tool_fields)):
+        cost = len(encoding.encode(_packed_tool_block(tool_id, fields), disallowed_special=()))
+        guide = fields["additional_instructions"]
+        if guide and guide not in guide_tokens:
+            guide_tokens[guide] = len(encoding.encode(guide, disallowed_special=()))
+        # A guide already in the group is not sent again.
+        extra = guide_tokens[guide] if guide and guide not in guides else 0
+        if group and (len(group) >= max_tools or used + cost + extra > max_prompt_tokens):
+            groups.append(group)
+            group, used, guides = [], 0, set()
+            extra = guide_tokens[guide] if guide else 0
+        group.append(n)
+        used += cost + extra
+        if guide:
+            guides.add(guide)
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _parse_packed_answer(text):
+    """Return {tool_id (str): python_code} from a packed JSON answer; {} if it cannot be parsed."""
+    try:
+        entries = json.loads(text).get("tools", [])
+    except (ValueError, AttributeError):
+        return {}
+    codes = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and isinstance(entry.get("python_code"), str):
+            codes.setdefault(str(entry.get("tool_id")), entry["python_code"].strip())
+    return codes
+
+
+def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0, max_concurrency=8, use_batch_api=False, tools_per_request=8):
     """
     Convert Alteryx tool configurations in a DataFrame to equivalent Python code,
     incorporating I/O details so the LLM knows which dataframes are expected.
@@ -102,6 +289,13 @@ def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=
         message_placeholder: Optional message placeholder widget for UI feedback.
         model (str): The LLM model to use for code generation.
         temperature (float): Temperature parameter for LLM responses (0.0-2.0).
+        max_concurrency (int): Maximum number of code requests in flight at once.
+        use_batch_api (bool): Submit all tools as one OpenAI Batch API job (half the token
+                              cost, but results can take minutes to hours). Tools the batch
+                              does not return are then generated with regular requests.
+        tools_per_request (int): Most tools packed into one regular request (see pack_tools);
+                                 1 sends every tool on its own. Tools missing from a packed
+                                 answer are generated on their own.
 
     Returns:
         pd.DataFrame: A DataFrame with columns 'tool_id', 'tool_type', and 'python_code'.
@@ -126,48 +320,133 @@ def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=
         template=template
     )
 
-    results = []
     total_tools = len(df_nodes)  # Total number of tools to process
+    connection_index = build_connection_index(df_connections)
     rest_tools = total_tools
     progress_value = 0.05  # Initial progress value
-    # Process each node in the DataFrame (using Responses API).
-    for index, row in df_nodes.iterrows():
-        tool_name = row["tool_type"]
+    rows = list(df_nodes.itertuples(index=False))
+
+    def prompt_fields(row):
         # Inject additional instructions if available in the dictionary.
-        additional_instructions = (
-            f'Refer to this additional information for "{tool_name}" tool - {comprehensive_guide[tool_name]}'
-            if tool_name in comprehensive_guide else ""
-        )
+        additional_instructions = _ADDITIONAL_INSTRUCTIONS.get(row.tool_type, "")
         # Create the I/O description using the helper function.
-        io_info = create_tool_io_template(df_connections, row["tool_id"])
-
-        generated_code = _call_responses_api_from_prompt_template(
-            prompt_template, model, temperature,
-            tool_type=row["tool_type"],
-            config_text=row["text"],
-            io_info=io_info,
-            additional_instructions=additional_instructions,
-        )
-
-        results.append({
-            "tool_id": row["tool_id"],
-            "tool_type": row["tool_type"],
-            "python_code": generated_code
-        })
-
-        
-        # Update progress bar
+        io_info = create_tool_io_template(df_connections, row.tool_id, connection_index)
+
+        return {
+            "tool_type": row.tool_type,
+            "config_text": row.text,
+            "io_info": io_info,
+            "additional_instructions": additional_instructions,
+        }
+
+    fields = [prompt_fields(row) for row in rows]
+    prompts = [prompt_template.format(**tool_fields) for tool_fields in fields]
+    generated = [None] * total_tools
+    last_ui_update = 0.0
+
+    def advance(positions, force=False):
+        # Count the given positions, and every tool sharing their prompt, as done. Each
+        # progress update is a round trip to the browser, so they are sent at most every
+        # _UI_UPDATE_INTERVAL seconds; force (and the last tool) always sends one.
+        nonlocal progress_value, rest_tools, last_ui_update
+        count = sum(copies[n] for n in positions)
+        if not count:
+            return False
+        rest_tools -= count
+        progress_value += (count / total_tools)*0.8
+        now = time.monotonic()
+        if not (force or rest_tools == 0) and now - last_ui_update < _UI_UPDATE_INTERVAL:
+            return False
+        last_ui_update = now
         if progress_bar is not None:
-            progress_value += (1 / total_tools)*0.8
             progress_bar.progress(min(max(progress_value, 0.0), 1.0))  # Clamp the value between 0.0 and 1.0
-
-        rest_tools -= 1
-        # Update message_placeholder
+        return True
+
+    # Responses are cached on disk by prompt, so re-running the same tools skips the API,
+    # and tools with an identical prompt are only generated once per run (unique[n] is the
+    # first position whose prompt equals that of position n).
+    cache_keys = [llm_cache.make_key(model, temperature, prompt) for prompt in prompts]
+    first_position = {}
+    unique = [first_position.setdefault(prompt, n) for n, prompt in enumerate(prompts)]
+    copies = Counter(unique)
+    for n in first_position.values():
+        generated[n] = llm_cache.get(cache_keys[n])
+    advance([n for n in first_position.values() if generated[n] is not None], force=True)
+
+    if use_batch_api and rest_tools:
+        def on_poll(completed, total):
+            if message_placeholder is not None:
+                message_placeholder.write(f"**Batch job: {completed} of {total} tool(s) generated...**")
+
+        batch_prompts = {str(n): prompts[n] for n in first_position.values() if generated[n] is None}
         if message_placeholder is not None:
-            message_placeholder.write(
-                f"**Generating code for {rest_tools} tool(s), it may take {rest_tools * 4} seconds...**")
-
-    return pd.DataFrame(results)
+            message_placeholder.write(f"**Submitting {len(batch_prompts)} tool(s) as a batch job...**")
+        try:
+            batch_results = _run_responses_batch(model, temperature, batch_prompts, on_poll=on_poll)
+        except Exception as e:
+            print(f"Error running code generation batch: {e}")
+            batch_results = {}
+        done = [int(custom_id) for custom_id, code in batch_results.items() if code]
+        for n in done:
+            generated[n] = batch_results[str(n)]
+            llm_cache.put(cache_keys[n], generated[n])
+        advance(done, force=True)
+
+    def generate_group(group):
+        # Returns {position: python_code}; packed groups fall back to one request per tool
+        # for every tool the JSON answer does not cover.
+        codes = {}
+        if len(group) > 1:
+            tools_block = "\n\n".join(_packed_tool_block(rows[n].tool_id, fields[n]) for n in group)
+            guides = "\n".join(dict.fromkeys(
+                fields[n]["additional_instructions"] for n in group if fields[n]["additional_instructions"]
+            ))
+            try:
+                answer = _call_responses_api(
+                    model, temperature,
+                    _PACKED_TEMPLATE.format(guides=guides, tools_block=tools_block),
+                    json_output=True,
+                )
+                packed = _parse_packed_answer(answer)
+            except Exception as e:
+                print(f"Error generating code for {len(group)} tools in one request, generating them one by one: {e}")
+                packed = {}
+            for n in group:
+                if packed.get(str(rows[n].tool_id)):
+                    codes[n] = packed[str(rows[n].tool_id)]
+        for n in group:
+            if n not in codes:
+                codes[n] = _call_responses_api(model, temperature, prompts[n])
+        return codes
+
+    # Tool groups are independent, so their requests run concurrently (Responses API calls
+    # are I/O-bound). Results are stored by position, and the Streamlit widgets are only
+    # updated from this thread, as each request finishes.
+    pending = [n for n in first_position.values() if generated[n] is None]
+    groups = [
+        [pending[n] for n in group]
+        for group in pack_tools(
+            [rows[n].tool_id for n in pending], [fields[n] for n in pending],
+            model=model, max_tools=max(1, tools_per_request),
+        )
+    ]
+    workers = max(1, min(max_concurrency, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_group, group): group for group in groups}
+        for future in as_completed(futures):
+            for n, code in future.result().items():
+                generated[n] = code
+                llm_cache.put(cache_keys[n], code)
+            # Update message_placeholder along with the (debounced) progress bar
+            if advance(futures[future]) and message_placeholder is not None:
+                message_placeholder.write(
+                    f"**Generating code for {rest_tools} tool(s), it may take {-(-rest_tools // workers) * 4} seconds...**")
+
+    return pd.DataFrame({
+        "tool_id": [row.tool_id for row in rows],
+        "tool_type": [row.tool_type for row in rows],
+        "python_code": [generated[n] for n in unique],
+    }, columns=["tool_id", "tool_type", "python_code"])
 
 
 def combine_python_code_of_tools(tool_ids, df_generated_code, execution_sequence="",extra_user_instructions="", model="gpt-4o", temperature=0.0):
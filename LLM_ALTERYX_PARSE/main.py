@@ -276,6 +276,13 @@ temperature = st.sidebar.slider(
     help="Controls randomness in the AI responses. Lower values (0.0-0.3) make responses more focused and deterministic. Higher values (0.7-1.0) make responses more creative and varied."
 )
 
+# Batch API option for per-tool code generation
+use_batch_api = st.sidebar.checkbox(
+    "Use Batch API (half price, slower)",
+    value=False,
+    help="Submit the per-tool code requests as one OpenAI Batch API job. Costs about half as much, but the job can take minutes to hours to finish."
+)
+
 st.sidebar.markdown("---")
 st.sidebar.header("Helpers")
 
@@ -469,7 +476,7 @@ with tab1:
                 st.write(f"Tool IDs ordered has been adjusted based on execution sequence.")
                 progress_bar.progress(0.1)
 
-                df_generated_code = prompt_helper.generate_python_code_from_alteryx_df(test_df, df_connections, progress_bar, message_placeholder, model=code_generate_model, temperature=temperature)
+                df_generated_code = prompt_helper.generate_python_code_from_alteryx_df(test_df, df_connections, progress_bar, message_placeholder, model=code_generate_model, temperature=temperature, use_batch_api=use_batch_api)
 
                 # If "tool_id" is missing in df_generated_code, insert it
                 if "tool_id" not in df_generated_code.columns:
@@ -4,18 +4,26 @@ from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from code.ToolContextDictionary import comprehensive_guide
-from code.traverse_helper import get_input_name, get_output_name
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
 
 
-def create_tool_io_description(df_connections, tool_id):
+def create_tool_io_description(df_connections, tool_id, connection_index=None):
     """
     For a given tool_id, create a human-readable description of its inputs and outputs.
     
     Example output:
     "This tool receives data from tools 580 and 582, and produces output that will be used by subsequent tools."
+
+    Pass connection_index (from build_connection_index) when describing many tools to
+    avoid scanning df_connections once per tool.
     """
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
 
     num_inputs = len(input_details)
     num_outputs = len(output_details)
@@ -110,6 +118,7 @@ def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, mess
 
     results = []
     total_tools = len(df_nodes)
+    connection_index = build_connection_index(df_connections)
 
     for index, row in df_nodes.iterrows():
         tool_id = row["tool_id"]
@@ -121,7 +130,7 @@ def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, mess
             config_text = config_text[:8000] + "... [truncated]"
 
         # Get I/O context
-        io_context = create_tool_io_description(df_connections, tool_id)
+        io_context = create_tool_io_description(df_connections, tool_id, connection_index)
 
         # Get additional context for this tool type
         additional_context = comprehensive_guide.get(tool_type, "")
@@ -213,6 +222,7 @@ def generate_concise_tool_descriptions(df_nodes, df_connections, progress_bar=No
 
     results = []
     total_tools = len(df_nodes)
+    connection_index = build_connection_index(df_connections)
 
     for index, row in df_nodes.iterrows():
         tool_id = row["tool_id"]
@@ -224,7 +234,7 @@ def generate_concise_tool_descriptions(df_nodes, df_connections, progress_bar=No
             config_text = config_text[:8000] + "... [truncated]"
 
         # Get I/O context
-        io_context = create_tool_io_description(df_connections, tool_id)
+        io_context = create_tool_io_description(df_connections, tool_id, connection_index)
 
         try:
             description = chain.run({
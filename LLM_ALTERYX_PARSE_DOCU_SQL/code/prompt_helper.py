@@ -3,7 +3,7 @@ import os
 import sys
 print(os.getcwd())
 
-from code.traverse_helper import get_input_name, get_output_name
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
 import pandas as pd
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
@@ -12,7 +12,15 @@ from code.ToolContextDictionary import comprehensive_guide
 import streamlit as st
 
 
-def create_tool_io_template(df_connections, tool_id):
+_ORDINAL_SUFFIXES = {1: "st", 2: "nd", 3: "rd"}
+
+
+def _ordinal(n):
+    # "1st", "2nd", "3rd", then "<n>th"; tools rarely have more than a few outputs.
+    return f"{n}{_ORDINAL_SUFFIXES.get(n, 'th')}"
+
+
+def create_tool_io_template(df_connections, tool_id, connection_index=None):
     """
     For a given tool_id, create a template string describing its inputs and outputs.
     The template will use get_input_name and get_output_name to obtain the names.
@@ -20,10 +28,18 @@ def create_tool_io_template(df_connections, tool_id):
     Example output:
     "This tool (tool id 583) has 2 input(s): df_580_Output connects to the 'Left', df_582_Output connects to the 'Right'.
      And the 1st output is df_583_Join."
+
+    Pass connection_index (from build_connection_index) when generating code for many tools to
+    avoid scanning df_connections once per tool.
     """
     # Use the helper functions to get input and output names
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
 
     num_inputs = len(input_details)
     # Build input details string
@@ -38,19 +54,9 @@ def create_tool_io_template(df_connections, tool_id):
     if num_outputs == 0:
         output_str = "No outputs"
     else:
-        output_str_list = []
-        for i, out in enumerate(output_details):
-            # Determine ordinal representation
-            if i == 0:
-                ordinal = "1st"
-            elif i == 1:
-                ordinal = "2nd"
-            elif i == 2:
-                ordinal = "3rd"
-            else:
-                ordinal = f"{ i +1}th"
-            output_str_list.append(f"name the {ordinal} output as {out}")
-        output_str = ", ".join(output_str_list)
+        output_str = ", ".join(
+            f"name the {_ordinal(i)} output as {out}" for i, out in enumerate(output_details, start=1)
+        )
 
     template_text = (f"This tool with id {tool_id} has {num_inputs} input(s), their variable name is {input_str}. Use {input_str} as the input for this tool "
                      f"And {output_str}.")
@@ -97,6 +103,7 @@ def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=
 
     results = []
     total_tools = len(df_nodes)  # Total number of tools to process
+    connection_index = build_connection_index(df_connections)
     rest_tools = total_tools
 
     for index, row in df_nodes.iterrows():
@@ -109,7 +116,7 @@ def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=
             config_text = config_text[:8000] + "... [truncated]"
 
         # Get I/O information for this tool
-        io_info = create_tool_io_template(df_connections, tool_id)
+        io_info = create_tool_io_template(df_connections, tool_id, connection_index)
 
         # Get additional instructions for this tool type
         additional_instructions = comprehensive_guide.get(tool_type, "")
@@ -200,6 +207,7 @@ def generate_sql_code_from_alteryx_df(df_nodes, df_connections, progress_bar=Non
 
     results = []
     total_tools = len(df_nodes)  # Total number of tools to process
+    connection_index = build_connection_index(df_connections)
     rest_tools = total_tools
 
     for index, row in df_nodes.iterrows():
@@ -212,7 +220,7 @@ def generate_sql_code_from_alteryx_df(df_nodes, df_connections, progress_bar=Non
             config_text = config_text[:8000] + "... [truncated]"
 
         # Get I/O information for this tool
-        io_info = create_tool_io_template(df_connections, tool_id)
+        io_info = create_tool_io_template(df_connections, tool_id, connection_index)
 
         # Get additional instructions for this tool type
         additional_instructions = comprehensive_guide.get(tool_type, "")
@@ -15,9 +15,10 @@ import tempfile
 import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 from fastapi.exceptions import RequestValidationError
@@ -114,8 +115,18 @@ async def _cleanup_loop():
                     pass
 
 
+def _preload():
+    """Load the tokenizer BPE ranks (read or downloaded by tiktoken on first use) off the request path."""
+    try:
+        from code.ToolContextTokens import DEFAULT_MODEL, encoding_for
+        encoding_for(DEFAULT_MODEL)
+    except Exception as exc:
+        logging.warning("Tokenizer preload failed: %s", exc)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    threading.Thread(target=_preload, daemon=True).start()
     task = asyncio.create_task(_cleanup_loop())
     yield
     task.cancel()
@@ -306,6 +317,21 @@ class AdvancedStep1Request(BaseModel):
     config: SessionConfig
     tool_ids: List[str]
     extra_instructions: str = ""
+    # "openai_batch" trades latency (minutes, up to 24h) for half-price Batch API calls.
+    batch_mode: Literal["concurrent", "openai_batch"] = "concurrent"
+    # False drops the worked examples from the tool guides (rules and notes are kept).
+    include_examples: bool = True
+    # Description requests in flight at once in "concurrent" mode.
+    max_concurrency: int = 16
+    # Optional requests-per-minute cap for those requests (e.g. the account's RPM limit).
+    requests_per_minute: Optional[int] = None
+    # Optional tokens-per-minute cap for those requests (e.g. the account's TPM limit).
+    tokens_per_minute: Optional[int] = None
+    # Ignore cached descriptions and ask the model again (results still update the cache).
+    force_refresh: bool = False
+    # Start the step-2 structure guide as soon as the descriptions are ready; step 2 reuses
+    # it when called with the same descriptions and instructions.
+    prefetch_structure_guide: bool = True
 
 
 class ToolDescriptionItem(BaseModel):
@@ -313,6 +339,8 @@ class ToolDescriptionItem(BaseModel):
     tool_id: Union[str, int]
     tool_type: Optional[str] = ""
     description: str
+    # Set when step 1 could not describe the tool (description is then empty).
+    error: Optional[str] = None
 
 
 class AdvancedStep2Request(BaseModel):
@@ -322,6 +350,8 @@ class AdvancedStep2Request(BaseModel):
     extra_instructions: str = ""
     tool_descriptions: List[ToolDescriptionItem]
     execution_sequence: str
+    # True returns an SSE stream with "partial" text events instead of a single JSON response.
+    stream: bool = False
 
 
 class AdvancedStep3Request(BaseModel):
@@ -332,6 +362,8 @@ class AdvancedStep3Request(BaseModel):
     tool_descriptions: List[ToolDescriptionItem]
     execution_sequence: str
     workflow_description: str
+    # True returns an SSE stream with "partial" text events instead of a single JSON response.
+    stream: bool = False
 
 
 # ---------------------------------------------------------------------------
@@ -339,15 +371,29 @@ class AdvancedStep3Request(BaseModel):
 # ---------------------------------------------------------------------------
 
 class _SSEProgressBar:
-    """Thread-safe adapter: forwards progress() calls as SSE events."""
+    """
+    Thread-safe adapter: forwards progress() calls as SSE events.
+
+    Updates that move the bar by less than MIN_STEP are dropped (completion is always
+    sent), so a job over hundreds of tools emits at most ~100 progress events.
+    """
+
+    MIN_STEP = 0.01
 
     def __init__(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
         self._q = queue
         self._loop = loop
+        self._last = None
+        self._lock = threading.Lock()
 
     def progress(self, value: float):
+        value = float(min(max(value, 0.0), 1.0))
+        with self._lock:
+            if self._last is not None and value < 1.0 and abs(value - self._last) < self.MIN_STEP:
+                return
+            self._last = value
         asyncio.run_coroutine_threadsafe(
-            self._q.put({"type": "progress", "value": float(min(max(value, 0.0), 1.0))}),
+            self._q.put({"type": "progress", "value": value}),
             self._loop,
         )
 
@@ -365,6 +411,13 @@ class _SSEMessagePlaceholder:
             self._loop,
         )
 
+    def append(self, text: str):
+        """Forward a chunk of streamed LLM output; the client concatenates the chunks."""
+        asyncio.run_coroutine_threadsafe(
+            self._q.put({"type": "partial", "text": str(text)}),
+            self._loop,
+        )
+
 
 def _sse_bytes(payload: dict) -> str:
     return f"data: {json.dumps(payload)}\n\n"
@@ -454,8 +507,16 @@ def _parse_tool_ids(raw: List[str]) -> List[str]:
     return result
 
 
+_warmed_keys: set = set()
+
+
 def _set_api_key(api_key: str):
     os.environ["OPENAI_API_KEY"] = api_key
+    # Opt-in: open the pooled HTTPS connection for a new key in the background so the
+    # first LLM call does not pay for DNS/TLS setup.
+    if os.environ.get("LLM_WARMUP_CONNECTION", "").strip().lower() in ("1", "true", "yes") and api_key not in _warmed_keys:
+        _warmed_keys.add(api_key)
+        threading.Thread(target=prompt_helper.warm_up_connection, daemon=True).start()
 
 
 # ---------------------------------------------------------------------------
@@ -666,6 +727,7 @@ async def advanced_step1(req: AdvancedStep1Request):
     tool_ids = _parse_tool_ids(req.tool_ids)
     if not tool_ids:
         raise HTTPException(status_code=400, detail="No tool IDs provided.")
+    import pandas as pd
 
     def _work(progress_bar, message_placeholder):
         df_nodes, df_connections = parser.load_alteryx_data(path)
@@ -685,19 +747,38 @@ async def advanced_step1(req: AdvancedStep1Request):
             model=req.config.code_generate_model,
             temperature=req.config.temperature,
             extra_user_instructions=req.extra_instructions,
+            batch_mode=req.batch_mode,
+            include_examples=req.include_examples,
+            max_concurrency=req.max_concurrency,
+            requests_per_minute=req.requests_per_minute,
+            tokens_per_minute=req.tokens_per_minute,
+            force_refresh=req.force_refresh,
         )
 
         progress_bar.progress(1.0)
-        descriptions = df_descriptions.to_dict(orient="records")
-        # Normalize so frontend always receives string IDs (avoids 422 on step 2 with many tools)
-        descriptions = [
-            {"tool_id": str(r["tool_id"]), "tool_type": str(r["tool_type"]), "description": r["description"]}
-            for r in descriptions
-        ]
+        # Normalize so frontend always receives string IDs (avoids 422 on step 2 with many tools).
+        # Failed tools get an empty description plus "error"; later steps skip them.
+        descriptions = []
+        for r in df_descriptions.to_dict(orient="records"):
+            item = {"tool_id": str(r["tool_id"]), "tool_type": str(r["tool_type"]), "description": r["description"] or ""}
+            if r["error"]:
+                item["error"] = r["error"]
+            descriptions.append(item)
+        execution_sequence = ", ".join(str(t) for t in ordered_tool_ids)
+        if req.prefetch_structure_guide:
+            # Same inputs the frontend sends to step 2 (see advanced_step2)
+            description_generator.prefetch_combined_description(
+                tool_ids,
+                pd.DataFrame(descriptions),
+                execution_sequence=execution_sequence,
+                extra_user_instructions=req.extra_instructions,
+                model=req.config.reasoning_model,
+                temperature=req.config.temperature,
+            )
         return {
             "descriptions": descriptions,
             "ordered_tool_ids": [str(t) for t in ordered_tool_ids],
-            "execution_sequence": ", ".join(str(t) for t in ordered_tool_ids),
+            "execution_sequence": execution_sequence,
         }
 
     return await _run_with_sse(_work)
@@ -718,7 +799,7 @@ async def advanced_step2(req: AdvancedStep2Request):
 
     loop = asyncio.get_event_loop()
 
-    def _work():
+    def _work(on_text=None):
         workflow_description, workflow_prompt = description_generator.combine_tool_descriptions(
             tool_ids,
             df_descriptions,
@@ -726,9 +807,17 @@ async def advanced_step2(req: AdvancedStep2Request):
             extra_user_instructions=req.extra_instructions,
             model=req.config.reasoning_model,
             temperature=req.config.temperature,
+            on_text=on_text,
         )
         return workflow_description, workflow_prompt
 
+    if req.stream:
+        def _stream_work(progress_bar, message_placeholder):
+            workflow_description, workflow_prompt = _work(on_text=message_placeholder.append)
+            return {"workflow_description": workflow_description, "workflow_prompt": workflow_prompt}
+
+        return await _run_with_sse(_stream_work)
+
     try:
         workflow_description, workflow_prompt = await loop.run_in_executor(None, _work)
     except Exception as e:
@@ -761,7 +850,7 @@ async def advanced_step3(req: AdvancedStep3Request):
 
     loop = asyncio.get_event_loop()
 
-    def _work():
+    def _work(on_text=None):
         final_python_code, final_prompt = description_generator.generate_final_python_code(
             tool_ids,
             df_descriptions,
@@ -770,9 +859,17 @@ async def advanced_step3(req: AdvancedStep3Request):
             workflow_description=req.workflow_description,
             model=req.config.code_combine_model,
             temperature=req.config.temperature,
+            on_text=on_text,
         )
         return final_python_code, final_prompt
 
+    if req.stream:
+        def _stream_work(progress_bar, message_placeholder):
+            final_python_code, final_prompt = _work(on_text=message_placeholder.append)
+            return {"final_python_code": final_python_code, "final_prompt": final_prompt}
+
+        return await _run_with_sse(_stream_work)
+
     final_python_code, final_prompt = await loop.run_in_executor(None, _work)
     return {"final_python_code": final_python_code, "final_prompt": final_prompt}
 
@@ -784,19 +881,19 @@ def get_workflow(session_id: str):
     df_nodes, df_connections = parser.load_alteryx_data(path)
 
     nodes = [
-        {"tool_id": row["tool_id"], "tool_type": row["tool_type"]}
-        for _, row in df_nodes.iterrows()
+        {"tool_id": tool_id, "tool_type": tool_type}
+        for tool_id, tool_type in zip(df_nodes["tool_id"], df_nodes["tool_type"])
     ]
 
     connections = [
         {
-            "origin_tool_id": str(row["origin_tool_id"]) if row["origin_tool_id"] else "",
-            "origin_connection": str(row["origin_connection"]) if row["origin_connection"] else "",
-            "destination_tool_id": str(row["destination_tool_id"]) if row["destination_tool_id"] else "",
-            "destination_connection": str(row["destination_connection"]) if row["destination_connection"] else "",
+            "origin_tool_id": str(row.origin_tool_id) if row.origin_tool_id else "",
+            "origin_connection": str(row.origin_connection) if row.origin_connection else "",
+            "destination_tool_id": str(row.destination_tool_id) if row.destination_tool_id else "",
+            "destination_connection": str(row.destination_connection) if row.destination_connection else "",
         }
-        for _, row in df_connections.iterrows()
-        if row["origin_tool_id"] and row["destination_tool_id"]
+        for row in df_connections.itertuples(index=False)
+        if row.origin_tool_id and row.destination_tool_id
     ]
 
     return {"nodes": nodes, "connections": connections}
@@ -819,17 +916,14 @@ async def describe_workflow_tools(req: WorkflowDescribeRequest):
         df_tools = df_nodes[~df_nodes["tool_type"].isin(["BrowseV2"])]
 
         total = len(df_tools)
-        descriptions: Dict[str, str] = {}
-
-        for i, (_, row) in enumerate(df_tools.iterrows()):
-            tool_id = str(row["tool_id"])
-            tool_type = str(row["tool_type"])
+        connection_index = traverse_helper.build_connection_index(df_connections)
 
-            config_text = str(row.get("text", ""))
+        def describe(raw_tool_id, tool_type, raw_text):
+            config_text = str(raw_text)
             if len(config_text) > 1500:
                 config_text = config_text[:1500] + "…"
 
-            io_context = create_tool_io_description(df_connections, row["tool_id"])
+            io_context = create_tool_io_description(df_connections, raw_tool_id, connection_index)
 
             prompt = (
                 f"Describe this Alteryx {tool_type} tool in one sentence (max 20 words). "
@@ -838,20 +932,27 @@ async def describe_workflow_tools(req: WorkflowDescribeRequest):
                 f"Data flow: {io_context}\n"
                 f"Return only the sentence, no prefix."
             )
-
-            message_placeholder.write(f"Describing tool {i + 1}/{total}: {tool_type} ({tool_id})")
             try:
-                desc = _call_responses_api(
+                return _call_responses_api(
                     req.config.code_generate_model,
                     req.config.temperature,
                     prompt,
                 )
             except Exception as exc:
-                desc = f"{tool_type} tool."
-                print(f"Error describing tool {tool_id}: {exc}")
-
-            descriptions[tool_id] = desc
-            progress_bar.progress((i + 1) / total)
+                print(f"Error describing tool {raw_tool_id}: {exc}")
+                return f"{tool_type} tool."
+
+        texts = df_tools["text"] if "text" in df_tools.columns else [""] * total
+        rows = list(zip(df_tools["tool_id"], df_tools["tool_type"].astype(str), texts))
+        # Keys are inserted in workflow order; values are filled in as the requests finish.
+        descriptions: Dict[str, str] = {str(raw_tool_id): "" for raw_tool_id, _, _ in rows}
+        with ThreadPoolExecutor(max_workers=max(1, min(10, total))) as executor:
+            futures = {executor.submit(describe, *row): row for row in rows}
+            for done, future in enumerate(as_completed(futures), start=1):
+                raw_tool_id, tool_type, _ = futures[future]
+                descriptions[str(raw_tool_id)] = future.result()
+                message_placeholder.write(f"Described tool {done}/{total}: {tool_type} ({raw_tool_id})")
+                progress_bar.progress(done / total)
 
         return {"descriptions": descriptions}
 
@@ -876,6 +977,8 @@ class SqlAdvancedStep2Request(BaseModel):
     extra_instructions: str = ""
     tool_descriptions: List[Dict[str, str]]
     execution_sequence: str
+    # True returns an SSE stream with "partial" text events instead of a single JSON response.
+    stream: bool = False
 
 
 class SqlAdvancedStep3Request(BaseModel):
@@ -886,6 +989,8 @@ class SqlAdvancedStep3Request(BaseModel):
     tool_descriptions: List[Dict[str, str]]
     execution_sequence: str
     sql_structure_guide: str
+    # True returns an SSE stream with "partial" text events instead of a single JSON response.
+    stream: bool = False
 
 
 @app.post("/api/convert/sql/direct")
@@ -945,13 +1050,14 @@ async def convert_sql_direct(req: SqlDirectConvertRequest):
 @app.post("/api/convert/sql/advanced/step1")
 async def sql_advanced_step1(req: AdvancedStep1Request):
     """SSE endpoint: generate tool descriptions for SQL workflow (reuses Python descriptions)."""
-    # Same as Python step1 — descriptions are language-agnostic
-    return await advanced_step1(req)
+    # Same as Python step1 — descriptions are language-agnostic. SQL step 2 builds its own
+    # combined description, so the Python structure guide is not prefetched.
+    return await advanced_step1(req.model_copy(update={"prefetch_structure_guide": False}))
 
 
 @app.post("/api/convert/sql/advanced/step2")
 async def sql_advanced_step2(req: SqlAdvancedStep2Request):
-    """Generate SQL structure guide (JSON response)."""
+    """Generate SQL structure guide (JSON response, or SSE with partial text when req.stream)."""
     _get_session_path(req.session_id)  # validate session exists
     _set_api_key(req.config.api_key)
 
@@ -961,22 +1067,30 @@ async def sql_advanced_step2(req: SqlAdvancedStep2Request):
 
     loop = asyncio.get_event_loop()
 
-    def _work():
+    def _work(on_text=None):
         return sql_generator.combine_sql_descriptions(
             tool_ids, df_descriptions,
             execution_sequence=req.execution_sequence,
             extra_user_instructions=req.extra_instructions,
             model=req.config.reasoning_model,
             temperature=req.config.temperature,
+            on_text=on_text,
         )
 
+    if req.stream:
+        def _stream_work(progress_bar, message_placeholder):
+            sql_structure_guide, sql_structure_prompt = _work(on_text=message_placeholder.append)
+            return {"sql_structure_guide": sql_structure_guide, "sql_structure_prompt": sql_structure_prompt}
+
+        return await _run_with_sse(_stream_work)
+
     sql_structure_guide, sql_structure_prompt = await loop.run_in_executor(None, _work)
     return {"sql_structure_guide": sql_structure_guide, "sql_structure_prompt": sql_structure_prompt}
 
 
 @app.post("/api/convert/sql/advanced/step3")
 async def sql_advanced_step3(req: SqlAdvancedStep3Request):
-    """Generate final SQL code (JSON response)."""
+    """Generate final SQL code (JSON response, or SSE with partial text when req.stream)."""
     _get_session_path(req.session_id)  # validate session exists
     _set_api_key(req.config.api_key)
 
@@ -986,7 +1100,7 @@ async def sql_advanced_step3(req: SqlAdvancedStep3Request):
 
     loop = asyncio.get_event_loop()
 
-    def _work():
+    def _work(on_text=None):
         return sql_generator.generate_final_sql(
             tool_ids, df_descriptions,
             execution_sequence=req.execution_sequence,
@@ -994,8 +1108,16 @@ async def sql_advanced_step3(req: SqlAdvancedStep3Request):
             sql_structure_guide=req.sql_structure_guide,
             model=req.config.code_combine_model,
             temperature=req.config.temperature,
+            on_text=on_text,
         )
 
+    if req.stream:
+        def _stream_work(progress_bar, message_placeholder):
+            final_sql, final_prompt = _work(on_text=message_placeholder.append)
+            return {"final_sql": final_sql, "final_prompt": final_prompt}
+
+        return await _run_with_sse(_stream_work)
+
     final_sql, final_prompt = await loop.run_in_executor(None, _work)
     return {"final_sql": final_sql, "final_prompt": final_prompt}
 
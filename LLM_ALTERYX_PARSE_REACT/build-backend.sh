@@ -36,7 +36,9 @@ pyinstaller \
   --hidden-import=langchain \
   --hidden-import=langchain_openai \
   --hidden-import=pandas \
-  --hidden-import=networkx \
+  --hidden-import=tiktoken \
+  --hidden-import=tiktoken_ext.openai_public \
+  --hidden-import=yaml \
   --hidden-import=dotenv \
   --hidden-import=code \
   --hidden-import=code.alteryx_parser \
@@ -47,10 +49,15 @@ pyinstaller \
   --hidden-import=code.fabric_parser \
   --hidden-import=code.fabric_generator \
   --hidden-import=code.ToolContextDictionary \
+  --hidden-import=code.ToolContextTokens \
+  --hidden-import=code.llm_cache \
   --collect-all=langchain \
   --collect-all=langchain_openai \
   --collect-all=langchain_core \
   --collect-all=langchain_text_splitters \
   --add-data "code:code"
 
+# Ship the bundled tool guides gzip-compressed (source tree stays plain text)
+python scripts/precompile_contexts.py --gzip --dir dist-backend/api/_internal/code/tool_contexts
+
 echo "=== Backend build complete: dist-backend/api/ ==="
@@ -0,0 +1,91 @@
+"""
+ToolContextTokens.py — cached tiktoken encodings of the tool guide texts.
+
+Guide texts are immutable for a given release, so the token count of each guide
+section is computed once per (tool, model) pair and process.
+
+fit_guide() uses the cached per-section counts to fit the guide appended to each
+per-tool prompt into a token budget, dropping the lowest-priority sections (notes,
+then examples) first.
+"""
+
+import functools
+
+import tiktoken
+
+from code.ToolContextDictionary import comprehensive_guide, render
+
+# Model whose tokenizer is used when the caller does not name one.
+DEFAULT_MODEL = "gpt-4o"
+# Encoding used for models that tiktoken does not know about yet (e.g. new releases).
+DEFAULT_ENCODING = "o200k_base"
+
+
+@functools.lru_cache(maxsize=None)
+def encoding_for(model):
+    """Return the tiktoken encoding for a model, falling back to DEFAULT_ENCODING."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+@functools.lru_cache(maxsize=None)
+def _fragment_tokens(separator, model):
+    return tuple(encoding_for(model).encode(separator))
+
+
+@functools.lru_cache(maxsize=None)
+def section_tokens(tool, model):
+    """((priority, text, token_count), ...) for the sections of a tool's guide, counted in one batch."""
+    sections = comprehensive_guide.sections(tool)
+    counts = encoding_for(model).encode_batch([text for _, text in sections])
+    return tuple((priority, text, len(ids)) for (priority, text), ids in zip(sections, counts))
+
+
+def _join_sections(tool, section_positions, model):
+    sections = section_tokens(tool, model)
+    return "\n\n".join(sections[i][1] for i in sorted(section_positions))
+
+
+@functools.lru_cache(maxsize=256)
+def _text_token_count(text, model):
+    return len(encoding_for(model).encode(text, disallowed_special=()))
+
+
+def fit_guide(tool, budget_tokens, model=DEFAULT_MODEL, examples_matching=None):
+    """
+    Guide text for one tool type within a token budget.
+
+    Parameters:
+        tool (str): Tool type.
+        budget_tokens (int): Maximum number of tokens for the returned text.
+        model (str): Model whose tokenizer the budget is measured in.
+        examples_matching (str | None): Passed to render() to keep only relevant examples.
+
+    Returns:
+        str: render(tool, examples_matching=...) when it fits; otherwise the sections that
+             render kept, admitted by priority (rules, then examples, then notes) until
+             the first one that does not fit. Empty when the tool has no guide or not
+             even its first rule section fits.
+    """
+    if tool not in comprehensive_guide:
+        return ""
+    text = render(tool, examples_matching=examples_matching)
+    if _text_token_count(text, model) <= budget_tokens:
+        return text
+
+    sections = section_tokens(tool, model)
+    separator = len(_fragment_tokens("\n\n", model))
+    used = len(_fragment_tokens("\n", model))
+    kept = []
+    for section_pos in sorted(
+        comprehensive_guide.section_indices(tool, examples_matching=examples_matching),
+        key=lambda i: sections[i][0],
+    ):
+        cost = sections[section_pos][2] + (separator if kept else 0)
+        if used + cost > budget_tokens:
+            break
+        used += cost
+        kept.append(section_pos)
+    return _join_sections(tool, kept, model) + "\n" if kept else ""
@@ -93,9 +93,7 @@ def extract_container_children(df_nodes):
     if container_rows.empty:
         print("No ToolContainer found in df_nodes.")  # Debugging information
 
-    for _, row in container_rows.iterrows():
-        container_id = row["tool_id"]
-        container_text = row["text"]
+    for container_id, container_text in zip(container_rows["tool_id"], container_rows["text"]):
         # Find all occurrences of ToolID="some_number"
         found_ids = re.findall(r'ToolID="(\d+)"', container_text)
         # Remove the container's own id from the list (if present)
@@ -115,22 +113,12 @@ def clean_container_children(df_containers, df_nodes):
     Returns a new DataFrame with the cleaned child_tools.
     """
     cleaned_results = []
+    # Tool type by ToolID (first row wins), built once instead of scanning df_nodes per child.
+    type_map = df_nodes.drop_duplicates("tool_id").set_index("tool_id")["tool_type"].to_dict()
 
-    for _, row in df_containers.iterrows():
-        container_id = row["container_id"]
-        child_ids = row["child_tools"]
-        filtered_ids = []
-        for cid in child_ids:
-            # Look up the child tool in df_nodes by its ToolID.
-            matching = df_nodes[df_nodes["tool_id"] == cid]
-            if not matching.empty:
-                # Check the tool type (case-insensitive)
-                child_type = matching.iloc[0]["tool_type"]
-                if child_type not in {"Toolcontainer", "BrowseV2"}:
-                    filtered_ids.append(cid)
-            else:
-                # If the child tool isn't found, include it (or you can choose to exclude it)
-                filtered_ids.append(cid)
+    for container_id, child_ids in zip(df_containers["container_id"], df_containers["child_tools"]):
+        # A child tool that isn't found in df_nodes is kept.
+        filtered_ids = [cid for cid in child_ids if type_map.get(cid) not in {"Toolcontainer", "BrowseV2"}]
 
         cleaned_results.append({
             "container_id": container_id,
@@ -1,46 +1,772 @@
-import pandas as pd
+import functools
+import hashlib
+import math
+import os
+import re
+import threading
 import time
-from langchain_core.prompts import PromptTemplate
-from code.ToolContextDictionary import comprehensive_guide
-from code.traverse_helper import get_input_name, get_output_name
-from code.prompt_helper import _call_responses_api_from_prompt_template
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from code import llm_cache
+from code.ToolContextDictionary import comprehensive_guide, render
+from code.ToolContextTokens import encoding_for
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
+from code.prompt_helper import _call_responses_api, _run_responses_batch, _stream_responses_api
+
+# Minimum seconds between progress updates while descriptions complete.
+_UI_UPDATE_INTERVAL = 0.25
+
+# Longest tool configuration sent for a description, in tokens of the target model.
+# Small models ("mini"/"nano") get a tighter limit: their context is shared with the
+# tool guide and they follow long configurations poorly anyway.
+_CONFIG_TOKEN_LIMIT = 6000
+_SMALL_MODEL_CONFIG_TOKEN_LIMIT = 2000
+
+# Tools whose configuration is at most this many tokens are described together when they
+# share the same instructions (tool guide), up to _GROUP_SIZE tools and _GROUP_TOKEN_BUDGET
+# configuration tokens per request; this saves a round trip and a copy of the guide for
+# each short Select/Sort/Formula tool.
+_SMALL_CONFIG_TOKENS = 1000
+_GROUP_SIZE = 8
+_GROUP_TOKEN_BUDGET = 3000
+
+# Output tokens assumed per description when a tokens-per-minute limit is set.
+_EXPECTED_OUTPUT_TOKENS = 1000
+
+# Largest block of tool descriptions sent in one structure-guide or final-code request;
+# bigger workflows are split into several requests.
+_DESCRIPTIONS_TOKEN_BUDGET = 60000
+
+# Structure guides started ahead of time by prefetch_combined_description, keyed by
+# _combine_key. Bounded so abandoned prefetches do not pile up.
+_MAX_PREFETCHED = 16
+_prefetched = {}
+_prefetch_lock = threading.Lock()
+_prefetch_executor = ThreadPoolExecutor(max_workers=2)
+
+# Prompts are split into static instructions (sent as the Responses API `instructions`,
+# byte-identical on every call so OpenAI's automatic prompt caching can reuse them) and a
+# small input template holding everything that varies per call. Keep the instructions free
+# of any interpolation.
+_DESCRIPTION_INSTRUCTIONS = """\
+You are an expert data engineer analyzing an Alteryx tool. Write a concise technical description (max 5 bullet points) for Python code generation.
+The tool ID, tool type, configuration, I/O context, tool context and user instructions are given in the input.
+When a guide for the tool type exists it follows these instructions; use it to interpret the configuration.
+
+Required format (plain text, no markdown headers):
+- Purpose: [1 sentence — what this tool does in business terms]
+- Inputs: [dataframe variable name(s)]
+- Outputs: [dataframe variable name(s)]
+- Operation: [filter/join/aggregate/transform/etc. with exact parameters — columns, conditions, join keys, formulas]
+- Notes: [data types, edge cases, or Alteryx quirks to handle — omit if none]
+
+Rules:
+- Be specific: include exact column names, filter conditions, join type, aggregation fields from the configuration.
+- Omit anything not needed for Python implementation.
+- No Python code examples. No XML details.
+
+Provide only the 5-bullet description."""
+
+# Fields that are the same for every tool of one type in a run come first, so they extend
+# the prefix shared with earlier requests; the per-tool fields follow.
+_DESCRIPTION_INPUT = """\
+User instructions: {extra_user_instructions}
+Tool type: {tool_type}
+Tool context: {additional_context}
+Tool ID: {tool_id}
+I/O context: {io_context}
+Configuration: {config_text}"""
+
+# Appended to the description instructions when several tools go in one request.
+_GROUP_INSTRUCTIONS = """\
+The input holds several tools, each starting with a line "### Tool <id>". Describe every one of them \
+in the required format and in input order, starting each description with a line "## Tool <id>"."""
+
+# "## Tool <id>" heading of one description in a grouped answer (tolerates "###", a
+# trailing colon or a "(type)" suffix).
+_GROUP_HEADING = re.compile(r"^#{2,3} Tool (\S+?):?(?:[ \t]+\(.*\))?[ \t]*$", re.MULTILINE)
+
+_COMBINE_INSTRUCTIONS = """\
+You are an expert Python data engineer writing a code structure guide for converting an Alteryx workflow to Python.
+The input contains technical descriptions of the workflow's tools, followed by additional context and the execution sequence.
+
+Rules (apply them throughout the guide and repeat them in the Implementation Notes):
+- Use meaningful business names for functions and dataframes (e.g. `customer_data_df`, not `df_155_Output`).
+- Do not produce "Left_"/"Right_" columns after joins: drop or rename columns before joining instead.
+- Combine similar tools with loops, list comprehensions or shared functions (e.g. "tools 13, 14, 15: one loop over the input files").
+- Alteryx tools can have several outputs (join, filter, ...); keep only those used downstream, returned as a tuple or clearly named variables.
+- No `main()` function: the code runs step by step in a Jupyter notebook, one phase after another in execution order.
+- Wrap each phase in try/except with an error message naming the failing step.
+- No data profiling or visualization; only process the data.
+
+Structure your response as:
+
+## Workflow Overview
+[The overall data processing purpose, in business language]
+
+## Python Code Structure Recommendations
+### Function Organization
+[Which related tools to group into functions, with descriptive names for their outputs]
+### Pythonic Optimizations
+[Tools that can be merged into a single loop/function]
+### Data Flow Management
+[How data is passed between steps, e.g. method chaining]
+
+## Technical Specification
+### Phase 1: Data Loading and Cleaning (one entry per data topic, e.g. customer or sales data)
+#### Data Topic: [Name]
+- **Related Tools**: [tool IDs]
+- **Description**: [What the dataset is and how the workflow uses it]
+- **Function Name**: [e.g. `load_and_prepare_customer_data`]
+- **Input/Output Variable Names**: [e.g. `raw_customer_df` -> `cleaned_customer_df`]
+- **Processing & Python Patterns**: [Loading, null handling, column standardization, type casting, ...]
+- **Code Example**: [short snippet, e.g.]
+```python
+def load_and_prepare_customer_data(filepath):
+    return (
+        pd.read_csv(filepath)
+        .dropna(subset=["customer_id"])
+        .rename(columns=lambda x: x.lower().strip())
+        .astype({"customer_id": int})
+        .drop_duplicates()
+    )
+```
+
+### Phase 2: Data Processing (one entry per processing unit that joins, combines or transforms data topics)
+#### Processing Unit: [Name, e.g. Merge Customers and Sales]
+- **Tools Included**: [tool IDs]
+- **Purpose**: [The business logic]
+- **Function Name**: [e.g. `combine_customer_sales`]
+- **Input/Output Variable Names**: [e.g. `cleaned_customer_df`, `sales_df` -> `customer_sales_df`]
+- **Detailed Steps**: [Column drops/renames before joins, filters, aggregations with `groupby.agg`, ...]
+- **Code Example**: [short snippet]
+
+### Phase 3: Data Output (one entry per output)
+- **Tools Included**: [tool IDs]
+- **Description**: [What is written and where]
+- **Function Name / Input Variable**: [e.g. `export_final_results(final_aggregated_df)`]
+- **Code Example**: [short snippet]
+
+## Implementation Notes
+[Implementation details, Alteryx-specific behaviour to reproduce, potential challenges, and the rules above]
+
+Provide only the code structure guide."""
+
+_COMBINE_INPUT = """\
+Individual tool descriptions:
+{all_descriptions}
+
+Additional context: {extra_user_instructions}
+Execution sequence: {execution_sequence}"""
+
+_MERGE_GUIDE_INSTRUCTIONS = """\
+You are an expert Python data engineer creating a comprehensive code structure guide for converting Alteryx workflows to Python.
+The workflow was too large for one pass, so the input contains partial code structure guides, each written for consecutive tools of the same workflow, in execution order, followed by additional context and the execution sequence.
+
+Merge them into one guide with the same section structure as the partial guides:
+- Keep every tool-specific recommendation, in execution order.
+- Use one consistent name for each dataframe and function, in particular for data passed from one part to the next.
+- State shared recommendations (imports, helpers, error handling, conventions) once instead of per part.
+- Do not mention the parts; the result must read as a single guide for the whole workflow.
+
+Provide only the merged code structure guide."""
+
+_MERGE_GUIDE_INPUT = """\
+Partial code structure guides:
+{partial_guides}
+
+Additional context: {extra_user_instructions}
+Execution sequence: {execution_sequence}"""
+
+_FINAL_CODE_INSTRUCTIONS = """\
+You are an expert Python data engineer generating working Python code from technical descriptions of Alteryx tools.
+The input contains the tool descriptions, followed by additional context, the execution sequence and a workflow structure guide.
+
+Write complete, runnable Python code that:
+- Implements every described tool, in execution order, including Alteryx-specific behaviour.
+- Strictly follows the structure guide: its function organization, variable/function names and Pythonic patterns.
+- Includes all imports, handles data types and conversions explicitly, and uses pandas method chaining where it helps.
+- Has try/except error handling naming the failing step, and comments explaining the business logic.
+- Follows PEP 8.
+- Is easy to debug and extend: no final `main()` that runs everything; lay the code out so it can run step by step in a Jupyter notebook.
+
+Provide only the Python code (no markdown formatting)."""
 
+_FINAL_CODE_INPUT = """\
+Individual tool descriptions:
+{all_descriptions}
 
-def create_tool_io_description(df_connections, tool_id):
+Additional context: {extra_user_instructions}
+Execution sequence: {execution_sequence}
+
+Workflow structure guide:
+{workflow_description}"""
+
+
+def create_tool_io_description(df_connections, tool_id, connection_index=None):
     """
-    For a given tool_id, create a human-readable description of its inputs and outputs.
-    
+    For a given tool_id, list its input and output dataframe names in a compact,
+    fixed format for the prompt (fewer tokens than an English sentence, and nothing
+    for the model to re-parse).
+
     Example output:
-    "This tool receives data from tools 580 and 582, and produces output that will be used by subsequent tools."
+    "Inputs: df_580_Output, df_582_Output; Outputs: df_583_Join"
+
+    Pass connection_index (from build_connection_index) when describing many tools
+    to avoid scanning df_connections once per tool.
     """
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
+    return _io_summary((inp[0] for inp in input_details), output_details)
 
-    num_inputs = len(input_details)
-    num_outputs = len(output_details)
-    
-    # Build input description
-    if num_inputs == 0:
-        input_desc = "This tool has no input data"
-    elif num_inputs == 1:
-        input_desc = f"This tool receives data from {input_details[0][0]}"
+
+def _io_summary(input_names, output_names):
+    return f"Inputs: {', '.join(input_names) or 'none'}; Outputs: {', '.join(output_names) or 'none'}"
+
+
+@functools.lru_cache(maxsize=256)
+def _description_instructions(guide):
+    # The tool guide (with its worked examples) is static per tool type, so it goes
+    # right after the fixed instructions: every tool of the same type then shares the
+    # whole prefix, and only the short per-tool input is new to the prompt cache.
+    return f"{_DESCRIPTION_INSTRUCTIONS}\n\nTool guide:\n{guide}" if guide else _DESCRIPTION_INSTRUCTIONS
+
+
+def _configuration(config_xml):
+    """Parse a node's inner XML and return its <Configuration> element, or None."""
+    try:
+        return ET.fromstring(f"<Node>{config_xml}</Node>").find("Properties/Configuration")
+    except ET.ParseError:
+        return None
+
+
+def _sentence(parts):
+    text = "; ".join(parts)
+    return text[:1].upper() + text[1:] + "."
+
+
+def _base_name(path):
+    # Workflow paths are usually Windows paths, whatever OS this runs on.
+    return re.split(r"[\\/]", path)[-1]
+
+
+def _bullets(purpose, inputs, outputs, operation, notes=None):
+    # Same layout as _DESCRIPTION_INSTRUCTIONS asks the model for.
+    lines = [
+        f"- Purpose: {purpose}",
+        f"- Inputs: {inputs or 'none'}",
+        f"- Outputs: {outputs or 'none'}",
+        f"- Operation: {operation}",
+    ]
+    if notes:
+        lines.append(f"- Notes: {notes}")
+    return "\n".join(lines)
+
+
+_TEXT_EXTENSIONS = (".csv", ".txt", ".tsv")
+_EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+
+def _file_target(configuration):
+    """
+    Split the <File> path of an input/output tool into (path, extension, sheet).
+
+    Returns None for anything other than a plain CSV/text or Excel file (database
+    connections, .yxdb, ...), which are left to the model.
+    """
+    path = (configuration.findtext("File") or "").strip()
+    path, _, table = path.partition("|||")
+    extension = os.path.splitext(path)[1].lower()
+    if not path or extension not in _TEXT_EXTENSIONS + _EXCEL_EXTENSIONS:
+        return None
+    # Alteryx sheet names carry a trailing "$" (and sometimes backticks); pandas wants the base name.
+    sheet = table.strip().strip("`")
+    if sheet.endswith("$"):
+        sheet = sheet[:-1]
+    return path, extension, sheet or None
+
+
+def _describe_file_input(tool_id, configuration, input_names, output_names):
+    target = _file_target(configuration)
+    if target is None:
+        return None
+    path, extension, sheet = target
+    options = configuration.find("FormatSpecificOptions")
+    options = options if options is not None else ET.Element("FormatSpecificOptions")
+
+    args = []
+    import_line = (options.findtext("ImportLine") or "").strip()
+    if import_line.isdigit() and int(import_line) > 1:
+        args.append(f"header={int(import_line) - 1}")
+    if extension in _EXCEL_EXTENSIONS:
+        reader = "pd.read_excel"
+        if sheet:
+            args.append(f"sheet_name={sheet!r}")
     else:
-        input_sources = [inp[0] for inp in input_details]
-        input_desc = f"This tool receives data from {', '.join(input_sources[:-1])} and {input_sources[-1]}"
-    
-    # Build output description
-    if num_outputs == 0:
-        output_desc = " and produces no output"
-    elif num_outputs == 1:
-        output_desc = f" and produces output named {output_details[0]}"
+        reader = "pd.read_csv"
+        delimiter = options.findtext("Delimeter")
+        if delimiter and delimiter != ",":
+            args.append(f"sep={delimiter!r}")
+    call = f"{reader}(path{''.join(', ' + a for a in args)})"
+
+    notes = []
+    if "*" in path:
+        notes.append("the path is a wildcard: read every matching file and concatenate them")
+    file_name_column = configuration.find("File").attrib.get("OutputFileName", "")
+    if "FileName" in file_name_column:
+        notes.append('add a "FileName" column with the file name without extension')
+    elif "Path" in file_name_column:
+        notes.append('add a "FileName" column with the absolute file path')
+    return _bullets(
+        f"Load {_base_name(path)} into a dataframe.",
+        "",
+        ", ".join(output_names),
+        f"Read '{path}' with {call}.",
+        _sentence(notes) if notes else None,
+    )
+
+
+def _describe_file_output(tool_id, configuration, input_names, output_names):
+    target = _file_target(configuration)
+    if target is None or len(input_names) != 1:
+        return None
+    path, extension, sheet = target
+    mode = (configuration.findtext("FormatSpecificOptions/OutputOption") or "").strip()
+    if extension in _EXCEL_EXTENSIONS:
+        operation = f"Write {input_names[0]} to '{path}' with to_excel(index=False"
+        operation += f", sheet_name={sheet!r})." if sheet else ")."
     else:
-        output_names = [out for out in output_details]
-        output_desc = f" and produces {num_outputs} outputs: {', '.join(output_names[:-1])} and {output_names[-1]}"
-    
-    return input_desc + output_desc
+        delimiter = configuration.findtext("FormatSpecificOptions/Delimeter")
+        sep = f", sep={delimiter!r}" if delimiter and delimiter != "," else ""
+        operation = f"Write {input_names[0]} to '{path}' with to_csv(index=False{sep})."
+    notes = f"Alteryx output option is {mode}." if mode and mode.lower() != "overwrite" else None
+    return _bullets(f"Save the result to {_base_name(path)}.", input_names[0], "", operation, notes)
+
+
+# Alteryx field types -> pandas dtype wording used in the descriptions.
+_SELECT_DTYPES = {
+    "Bool": "bool",
+    "Byte": "int64", "Int16": "int64", "Int32": "int64", "Int64": "int64",
+    "Float": "float64", "Double": "float64", "FixedDecimal": "float64",
+    "String": "str", "V_String": "str", "WString": "str", "V_WString": "str",
+    "Date": "datetime (pd.to_datetime)", "DateTime": "datetime (pd.to_datetime)",
+}
+
+
+def _describe_select(tool_id, configuration, input_names, output_names):
+    fields = configuration.findall("SelectFields/SelectField")
+    if len(input_names) != 1 or not fields:
+        return None
+    keep_unknown = True
+    selected, deselected, renames, casts = [], [], {}, {}
+    for field in fields:
+        name = field.attrib.get("field", "")
+        is_selected = field.attrib.get("selected") == "True"
+        if name == "*Unknown":
+            keep_unknown = is_selected
+            continue
+        if not is_selected:
+            deselected.append(name)
+            continue
+        selected.append(name)
+        new_name = field.attrib.get("rename")
+        if new_name and new_name != name:
+            renames[name] = new_name
+        field_type = field.attrib.get("type")
+        if field_type:
+            if field_type not in _SELECT_DTYPES:
+                return None
+            casts[renames.get(name, name)] = _SELECT_DTYPES[field_type]
+
+    steps = []
+    if not keep_unknown:
+        steps.append(f"keep only columns {selected}")
+    elif deselected:
+        steps.append(f"drop columns {deselected}")
+    if renames:
+        steps.append(f"rename columns {renames}")
+    if casts:
+        steps.append(f"convert dtypes {casts}")
+    if not steps:
+        steps.append("pass all columns through unchanged")
+    return _bullets(
+        "Select, rename and retype columns.",
+        input_names[0],
+        ", ".join(output_names),
+        _sentence(steps),
+        "Only convert the listed columns; columns without a type keep their dtype.",
+    )
+
+
+_SIMPLE_FILTER = re.compile(
+    r'^\s*\[(?P<field>[^\]]+)\]\s*(?P<op>==|=|!=|<>|<=|>=|<|>)\s*(?P<value>"[^"]*"|-?\d+(?:\.\d+)?)\s*$'
+)
+_FILTER_OPERATORS = {"=": "==", "==": "==", "<>": "!=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def _describe_filter(tool_id, configuration, input_names, output_names):
+    match = _SIMPLE_FILTER.match(configuration.findtext("Expression") or "")
+    if match is None or len(input_names) != 1:
+        return None
+    field, value = match["field"], match["value"]
+    condition = f'{input_names[0]}["{field}"] {_FILTER_OPERATORS[match["op"]]} {value}'
+    true_name = next((n for n in output_names if n.endswith("_True")), f"df_{tool_id}_True")
+    false_name = next((n for n in output_names if n.endswith("_False")), f"df_{tool_id}_False")
+    notes = None if value.startswith('"') else f'Convert "{field}" with pd.to_numeric before comparing if it is not numeric.'
+    return _bullets(
+        f"Split rows on the condition [{field}] {match['op']} {value}.",
+        input_names[0],
+        f"{true_name} (rows meeting the condition), {false_name} (the rest)",
+        f"mask = {condition}; {true_name} = {input_names[0]}[mask]; {false_name} = {input_names[0]}[~mask].",
+        notes,
+    )
+
+
+def _describe_container(tool_id, configuration, input_names, output_names):
+    if input_names or output_names:
+        return None
+    caption = (configuration.findtext("Caption") or "").strip()
+    purpose = f"Group the tools of the '{caption}' section on the canvas." if caption else "Group tools on the canvas."
+    return _bullets(purpose, "", "", "None; containers only organize the workflow, no code is needed.")
+
+
+def _describe_comment(tool_id, configuration, input_names, output_names):
+    if input_names or output_names:
+        return None
+    text = " ".join((configuration.findtext("Text") or "").split())
+    if not text:
+        return _bullets("Empty comment on the canvas.", "", "", "None; no code is needed.")
+    return _bullets("Comment on the canvas.", "", "", "None; keep the text as a Python comment.", f"Text: {text}")
+
+
+def _describe_browse(tool_id, configuration, input_names, output_names):
+    if len(input_names) != 1 or output_names:
+        return None
+    return _bullets(
+        f"Preview {input_names[0]} in the Alteryx results window.", input_names[0], "",
+        "None; no transformation (display with .head() only while debugging).",
+    )
+
+
+# Tool types whose configuration is regular enough to describe without the LLM. Each
+# describer returns None when the configuration is not the simple shape it handles.
+_DETERMINISTIC_DESCRIBERS = {
+    "Dbfileinput": _describe_file_input,
+    "Dbfileoutput": _describe_file_output,
+    "Alteryxdbfileoutput": _describe_file_output,
+    "Alteryxselect": _describe_select,
+    "Filter": _describe_filter,
+    # Tools that do no data processing at all.
+    "Toolcontainer": _describe_container,
+    "Textbox": _describe_comment,
+    "Browsev2": _describe_browse,
+}
+
+
+def describe_deterministically(tool_type, tool_id, config_xml, input_names, output_names):
+    """
+    Describe a tool from its configuration alone, without an LLM call.
+
+    Parameters:
+        tool_type (str): Tool type, as in df_nodes.
+        tool_id (str): Tool ID.
+        config_xml (str): The node's configuration XML (df_nodes 'text').
+        input_names (list[str]): Names of the dataframes feeding the tool.
+        output_names (list[str]): Names of the dataframes the tool produces.
+
+    Returns:
+        str | None: A description in the usual 5-bullet format, or None when the tool
+                    type has no describer or its configuration needs the model.
+    """
+    describer = _DETERMINISTIC_DESCRIBERS.get(tool_type)
+    if describer is None:
+        return None
+    configuration = _configuration(config_xml)
+    if configuration is None:
+        return None
+    return describer(tool_id, configuration, input_names, output_names)
+
+
+# Canvas layout that differs between otherwise identical tools: the GuiSettings position,
+# how the annotation is displayed, and indentation between tags.
+_COSMETIC = re.compile(r'<Position\b[^>]*/>|<Left value="(?:True|False)"\s*/>| DisplayMode="[^"]*"')
+_BETWEEN_TAGS = re.compile(r">\s+<")
+
+
+def _config_key(tool_type, config_text, input_names, output_names):
+    """Key under which tools can share one description: same type, configuration and I/O shape."""
+    normalized = _BETWEEN_TAGS.sub("><", _COSMETIC.sub("", config_text))
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+    return tool_type, digest, len(input_names), len(output_names)
+
+
+def _reuse_description(description, source_id, source_io, tool_id, tool_io):
+    """
+    Adapt the description of an identically configured tool: its dataframe names (and
+    tool ID, which appears in error messages) are replaced by this tool's, position by position.
+    """
+    mapping = {f"tool {source_id}": f"tool {tool_id}"}
+    for source_names, names in zip(source_io, tool_io):
+        mapping.update(zip(source_names, names))
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, sorted(mapping, key=len, reverse=True))) + r")\b")
+    return pattern.sub(lambda m: mapping[m[0]], description)
+
+
+def _config_token_limit(model):
+    """Token limit for one tool configuration sent to `model`."""
+    name = model.lower()
+    if "mini" in name or "nano" in name:
+        return _SMALL_MODEL_CONFIG_TOKEN_LIMIT
+    return _CONFIG_TOKEN_LIMIT
+
+
+def _truncate_to_tokens(texts, model, limit=None):
+    """
+    Cut each text to at most `limit` tokens of the model's tokenizer.
+
+    Character limits are a poor proxy for XML configurations (2-3 characters per
+    token), so the cut is made on the encoded token ids instead.
+
+    Parameters:
+        texts (list[str]): Configuration texts.
+        model (str): Model whose tokenizer measures the limit.
+        limit (int): Maximum number of tokens kept per text (default: _config_token_limit(model)).
+
+    Returns:
+        list[str]: The texts, with "... [truncated]" appended to those that were cut.
+    """
+    encoding = encoding_for(model)
+    if limit is None:
+        limit = _config_token_limit(model)
+    return [
+        text if len(ids) <= limit else encoding.decode(ids[:limit]) + "... [truncated]"
+        for text, ids in zip(texts, encoding.encode_batch(texts, disallowed_special=()))
+    ]
+
+
+def _description_cache_key(model, temperature, instructions, input_text):
+    # Keyed on the full instructions and input text, so editing either template
+    # invalidates old entries without a separate version number.
+    return llm_cache.make_key("tool_description", model, temperature, instructions, input_text)
+
+
+# (pattern, message) pairs checked in order against a failed request's error text;
+# the first match wins and None always matches.
+_ERROR_TABLE = (
+    (re.compile(r"rate_limit|429", re.IGNORECASE),
+     "Rate limit exceeded for tool {tool_id} ({tool_type}). Please wait and try again."),
+    (re.compile(r"token", re.IGNORECASE),
+     "Token limit exceeded for tool {tool_id} ({tool_type}). Configuration too large."),
+    (None, "Error generating description for tool {tool_id} ({tool_type}): {error}"),
+)
+
+
+class _RateLimiter:
+    """
+    Thread-safe token buckets for the account's requests-per-minute and tokens-per-minute
+    limits (either may be None), each allowing bursts of up to a full minute's budget.
+    Lets the description workers run at the account's limits instead of sending a burst
+    that comes back as 429s; acquire() only sleeps as long as the buckets require.
+    """
+
+    def __init__(self, model, requests_per_minute=None, tokens_per_minute=None):
+        self._model = model
+        # 0 disables a limit.
+        self._capacity = (float(requests_per_minute or 0), float(tokens_per_minute or 0))
+        self._available = list(self._capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, *texts, responses=1):
+        """
+        Block until one request made of `texts` fits both limits. Its token cost is the
+        prompt's token count plus _EXPECTED_OUTPUT_TOKENS per expected response; a request
+        larger than the whole token budget waits for a full bucket rather than forever.
+        """
+        tokens = 0
+        if self._capacity[1]:
+            encoding = encoding_for(self._model)
+            tokens = sum(len(encoding.encode(text, disallowed_special=())) for text in texts)
+            tokens = min(self._capacity[1], tokens + responses * _EXPECTED_OUTPUT_TOKENS)
+        cost = (1, tokens)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0.0
+                for n, capacity in enumerate(self._capacity):
+                    if capacity:
+                        self._available[n] = min(capacity, self._available[n] + (now - self._updated) * capacity / 60.0)
+                        wait = max(wait, (cost[n] - self._available[n]) * 60.0 / capacity)
+                self._updated = now
+                if wait <= 0:
+                    for n, capacity in enumerate(self._capacity):
+                        if capacity:
+                            self._available[n] -= cost[n]
+                    return
+            time.sleep(wait)
+
+
+def _error_message(tool_inputs, error_msg):
+    tool_id, tool_type = tool_inputs["tool_id"], tool_inputs["tool_type"]
+    for pattern, template in _ERROR_TABLE:
+        if pattern is None or pattern.search(error_msg):
+            return template.format(tool_id=tool_id, tool_type=tool_type, error=error_msg)
+
+
+def _describe_tool(model, temperature, tool_inputs, instructions=_DESCRIPTION_INSTRUCTIONS, rate_limiter=None, refresh=False):
+    """
+    Run one description request and return (description, error).
+
+    Rate limits and server errors are already retried with backoff by the shared client,
+    so a failure here is final: description is then None and error a readable message,
+    which keeps the error text out of the prompts built from the descriptions.
+    """
+    input_text = _DESCRIPTION_INPUT.format(**tool_inputs)
+    cache_key = _description_cache_key(model, temperature, instructions, input_text)
+    def request():
+        # Only requests that reach the API count against the rate limit, not cache hits.
+        if rate_limiter is not None:
+            rate_limiter.acquire(instructions, input_text)
+        return _call_responses_api(model, temperature, input_text, instructions=instructions)
+
+    try:
+        # Coalesced per key, so an identical tool being described by another request
+        # right now is waited for rather than sent twice.
+        return llm_cache.get_or_compute(cache_key, request, refresh), None
+    except Exception as e:
+        print(f"Error processing tool {tool_inputs['tool_id']}: {e}")
+        return None, _error_message(tool_inputs, str(e))
+
+
+def _split_group_answer(text):
+    # {tool_id: description} from a grouped answer; the first section of a repeated id wins.
+    parts = _GROUP_HEADING.split(text)
+    sections = {}
+    for tool_id, body in zip(parts[1::2], parts[2::2]):
+        sections.setdefault(tool_id, body.strip())
+    return sections
+
+
+def _describe_tool_group(model, temperature, group_inputs, instructions, rate_limiter=None, refresh=False):
+    """
+    Describe several tools that share the same instructions in one request.
+
+    Tools with a cached description are not sent, and each description is cached under
+    the tool's own key, so later runs hit the cache whether or not the tool is grouped.
+    A tool missing from the answer (or a failed request) falls back to _describe_tool.
+
+    Returns:
+        list[tuple]: (description, error) pairs in the order of group_inputs.
+    """
+    keys = [
+        _description_cache_key(model, temperature, instructions, _DESCRIPTION_INPUT.format(**tool_inputs))
+        for tool_inputs in group_inputs
+    ]
+    results = [None] * len(group_inputs)
+    todo = []
+    for n, key in enumerate(keys):
+        cached = llm_cache.get(key, refresh)
+        if cached is not None:
+            results[n] = (cached, None)
+        else:
+            todo.append(n)
+
+    if len(todo) > 1:
+        input_text = "\n\n".join(
+            f"### Tool {group_inputs[n]['tool_id']}\n{_DESCRIPTION_INPUT.format(**group_inputs[n])}" for n in todo
+        )
+        if rate_limiter is not None:
+            rate_limiter.acquire(instructions, _GROUP_INSTRUCTIONS, input_text, responses=len(todo))
+        try:
+            sections = _split_group_answer(_call_responses_api(
+                model, temperature, input_text, instructions=f"{instructions}\n\n{_GROUP_INSTRUCTIONS}"
+            ))
+        except Exception as e:
+            print(f"Error describing {len(todo)} tools in one request, describing them one by one: {e}")
+            sections = {}
+        for n in todo:
+            description = sections.get(str(group_inputs[n]["tool_id"]))
+            if description:
+                llm_cache.put(keys[n], description)
+                results[n] = (description, None)
 
+    return [
+        result or _describe_tool(model, temperature, group_inputs[n], instructions, rate_limiter, refresh)
+        for n, result in enumerate(results)
+    ]
 
-def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0, extra_user_instructions=""):
+
+def _group_small_tools(pending, inputs, instructions, model):
+    """
+    Split the pending tool indices into request groups: each tool with a large configuration
+    alone, small ones together (all with identical instructions, at most _GROUP_SIZE tools
+    and _GROUP_TOKEN_BUDGET configuration tokens per group).
+    """
+    counts = encoding_for(model).encode_batch([inputs[i]["config_text"] for i in pending], disallowed_special=())
+    groups, open_groups = [], {}
+    for i, ids in zip(pending, counts):
+        if len(ids) > _SMALL_CONFIG_TOKENS:
+            groups.append([i])
+            continue
+        group, used = open_groups.get(instructions[i], (None, 0))
+        if group is None or len(group) == _GROUP_SIZE or used + len(ids) > _GROUP_TOKEN_BUDGET:
+            group, used = [], 0
+            groups.append(group)
+        group.append(i)
+        open_groups[instructions[i]] = (group, used + len(ids))
+    return groups
+
+
+def _describe_tools_in_batch(model, temperature, inputs, instructions, progress_bar=None, message_placeholder=None, refresh=False):
+    """Describe all tools through one OpenAI Batch API job; returns (description, error) pairs in input order."""
+    def on_poll(completed, total):
+        if progress_bar is not None and total:
+            progress_bar.progress(completed / total)
+        if message_placeholder is not None:
+            message_placeholder.write(f"**Batch job running: {completed} of {total} description(s) done...**")
+
+    # Only prompts without a cached description go into the batch job.
+    texts, prompts, prompt_instructions, cache_keys = {}, {}, {}, {}
+    for i, (tool_inputs, tool_instructions) in enumerate(zip(inputs, instructions)):
+        input_text = _DESCRIPTION_INPUT.format(**tool_inputs)
+        cache_keys[str(i)] = _description_cache_key(model, temperature, tool_instructions, input_text)
+        cached = llm_cache.get(cache_keys[str(i)], refresh)
+        if cached is not None:
+            texts[str(i)] = cached
+        else:
+            prompts[str(i)] = input_text
+            prompt_instructions[str(i)] = tool_instructions
+
+    failure = "no result returned by the batch job"
+    if prompts:
+        if message_placeholder is not None:
+            message_placeholder.write(f"**Submitting {len(prompts)} description request(s) as a batch job...**")
+        try:
+            fresh = _run_responses_batch(
+                model, temperature, prompts, instructions=prompt_instructions, on_poll=on_poll
+            )
+        except Exception as e:
+            print(f"Error running description batch: {e}")
+            fresh = {}
+            failure = str(e)
+        for custom_id, text in fresh.items():
+            llm_cache.put(cache_keys[custom_id], text)
+        texts.update(fresh)
+
+    return [
+        (texts[str(i)], None) if texts.get(str(i)) else (None, _error_message(tool_inputs, failure))
+        for i, tool_inputs in enumerate(inputs)
+    ]
+
+
+def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0, extra_user_instructions="", max_concurrency=16, batch_mode="concurrent", include_examples=True, requests_per_minute=None, tokens_per_minute=None, force_refresh=False):
     """
     Convert Alteryx tool configurations into detailed technical descriptions for Python code generation.
     
@@ -51,113 +777,311 @@ def generate_tool_descriptions(df_nodes, df_connections, progress_bar=None, mess
         message_placeholder: Optional Streamlit placeholder for status messages.
         model (str): The LLM model to use for code generation.
         temperature (float): Temperature parameter for LLM responses (0.0-2.0).
+        max_concurrency (int): Maximum number of description requests in flight at once;
+                               rate-limited requests are retried by the shared client.
+        requests_per_minute (int): Optional cap on description requests sent per minute (e.g. the
+                                   account's RPM limit); None sends them as fast as max_concurrency allows.
+        tokens_per_minute (int): Optional cap on the tokens those requests use per minute (e.g. the
+                                 account's TPM limit), estimated from the prompt with tiktoken.
+        force_refresh (bool): Ask the LLM again even for tools with a cached description (the new
+                              descriptions replace the cached ones).
+        batch_mode (str): "concurrent" (default) calls the API directly. "openai_batch" submits all
+                          prompts as one OpenAI Batch API job: half the cost, but results can take
+                          minutes (up to 24h), so use it only when nobody is waiting interactively.
+        include_examples (bool): Set to False to leave the worked examples out of the tool guides,
+                                 keeping only their rules and notes.
     
     Returns:
-        pd.DataFrame: A DataFrame with columns 'tool_id', 'tool_type', and 'description'.
+        pd.DataFrame: A DataFrame with columns 'tool_id', 'tool_type', 'description' and 'error'.
         Each description contains detailed technical information needed for Python implementation.
+        For a tool whose request failed, description is None and error holds the reason
+        (error is None otherwise).
     """
-    template = """
-    You are an expert data engineer analyzing an Alteryx tool. Write a concise technical description (max 5 bullet points) for Python code generation.
-
-    Tool ID: {tool_id}
-    Tool type: {tool_type}
-    Configuration: {config_text}
-    I/O context: {io_context}
-    Tool context: {additional_context}
-    User instructions: {extra_user_instructions}
-
-    Required format (plain text, no markdown headers):
-    - Purpose: [1 sentence — what this tool does in business terms]
-    - Inputs: [dataframe variable name(s)]
-    - Outputs: [dataframe variable name(s)]
-    - Operation: [filter/join/aggregate/transform/etc. with exact parameters — columns, conditions, join keys, formulas]
-    - Notes: [data types, edge cases, or Alteryx quirks to handle — omit if none]
-
-    Rules:
-    - Be specific: include exact column names, filter conditions, join type, aggregation fields from the configuration.
-    - Omit anything not needed for Python implementation.
-    - No Python code examples. No XML details.
-
-    Provide only the 5-bullet description:
-    """
-
-    prompt_template = PromptTemplate(
-        input_variables=["tool_id", "tool_type", "config_text", "io_context", "additional_context", "extra_user_instructions"],
-        template=template
-    )
-
-    results = []
     total_tools = len(df_nodes)  # This is now the filtered dataframe length
-    progress_value = 0.0
     
     print(f"Processing {total_tools} tools for descriptions: {list(df_nodes['tool_id'])}")
-    
-    for tool_index, (index, row) in enumerate(df_nodes.iterrows()):  # Use enumerate to get proper counter
-        tool_name = row["tool_type"]
-        
-        # Truncate the configuration text to avoid token limits
-        config_text = row["text"]
-        if len(config_text) > 8000:  # Limit to ~8000 characters to stay within token limits
-            config_text = config_text[:8000] + "... [truncated]"
-        
-        # Get additional context from the comprehensive guide
-        additional_context = (
-            f'This tool is a "{tool_name}" tool. {comprehensive_guide.get(tool_name, "")}'
+
+    # Truncate the configuration texts to avoid token limits
+    truncated_texts = _truncate_to_tokens(df_nodes["text"].astype(str).tolist(), model)
+
+    # Build every prompt's inputs up front so the requests can run concurrently
+    inputs_by_tool, outputs_by_tool = build_connection_index(df_connections)
+    inputs, instructions, descriptions, io_names, config_keys = [], [], [], [], []
+    errors = [None] * total_tools
+    for row, config_text in zip(df_nodes.itertuples(index=False), truncated_texts):
+        tool_name = row.tool_type
+        input_names = [name for name, _ in inputs_by_tool.get(row.tool_id, [])]
+        output_names = outputs_by_tool.get(row.tool_id, [])
+        io_names.append((input_names, output_names))
+        config_keys.append(_config_key(tool_name, config_text, input_names, output_names))
+        # Stereotyped configurations (file I/O, Select, simple Filter) need no LLM call
+        descriptions.append(describe_deterministically(
+            tool_name, row.tool_id, str(row.text), input_names, output_names
+        ))
+        # Get additional context from the comprehensive guide, keeping only the
+        # worked examples relevant to this tool's configuration
+        guide = (
+            render(tool_name, include_examples=include_examples, examples_matching=row.text)
+            if tool_name in comprehensive_guide else ""
         )
-        
-        # Create I/O context description
-        io_context = create_tool_io_description(df_connections, row["tool_id"])
+        instructions.append(_description_instructions(guide))
+        inputs.append({
+            "tool_id": row.tool_id,
+            "tool_type": tool_name,
+            "config_text": config_text,
+            "io_context": _io_summary(input_names, output_names),
+            "additional_context": f'This tool is a "{tool_name}" tool.',
+            "extra_user_instructions": extra_user_instructions or "",
+        })
 
-        try:
-            generated_description = _call_responses_api_from_prompt_template(
-                prompt_template, model, temperature,
-                tool_id=row["tool_id"],
-                tool_type=row["tool_type"],
-                config_text=config_text,
-                io_context=io_context,
-                additional_context=additional_context,
-                extra_user_instructions=extra_user_instructions or "",
-            )
-        except Exception as e:
-            error_msg = str(e)
-            print(f"Error processing tool {row['tool_id']}: {error_msg}")
-            
-            # Handle specific error types
-            if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                generated_description = f"Rate limit exceeded for tool {row['tool_id']} ({row['tool_type']}). Please wait and try again."
-            elif "token" in error_msg.lower():
-                generated_description = f"Token limit exceeded for tool {row['tool_id']} ({row['tool_type']}). Configuration too large."
+    # Tools with the same type and configuration get one LLM call; the others reuse
+    # its description with their own dataframe names (see _reuse_description).
+    pending, duplicates, first_with_key = [], {}, {}
+    for i, description in enumerate(descriptions):
+        if description is not None:
+            continue
+        if config_keys[i] in first_with_key:
+            duplicates[i] = first_with_key[config_keys[i]]
+        else:
+            first_with_key[config_keys[i]] = i
+            pending.append(i)
+    print(
+        f"Described {total_tools - len(pending) - len(duplicates)} tool(s) from their configuration; "
+        f"{len(duplicates)} reuse a duplicate configuration's description; {len(pending)} need the LLM"
+    )
+    if pending and batch_mode == "openai_batch":
+        batch_descriptions = _describe_tools_in_batch(
+            model, temperature,
+            [inputs[i] for i in pending], [instructions[i] for i in pending],
+            progress_bar, message_placeholder, force_refresh,
+        )
+        for i, (description, error) in zip(pending, batch_descriptions):
+            descriptions[i], errors[i] = description, error
+    elif pending:
+        groups = _group_small_tools(pending, inputs, instructions, model)
+        workers = max(1, min(max_concurrency, len(groups)))
+        rate_limiter = (
+            _RateLimiter(model, requests_per_minute, tokens_per_minute)
+            if requests_per_minute or tokens_per_minute else None
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    _describe_tool_group, model, temperature,
+                    [inputs[i] for i in group], instructions[group[0]], rate_limiter, force_refresh,
+                ): group
+                for group in groups
+            }
+            # Cached descriptions complete almost instantly, so throttle the UI updates
+            # (each one is an event pushed to the client) instead of sending one per tool.
+            last_ui_update = time.monotonic()
+            done = total_tools - len(pending)
+            for future in as_completed(futures):
+                group = futures[future]
+                for i, (description, error) in zip(group, future.result()):
+                    descriptions[i], errors[i] = description, error
+                done += len(group)
+
+                now = time.monotonic()
+                if done < total_tools and now - last_ui_update < _UI_UPDATE_INTERVAL:
+                    continue
+                last_ui_update = now
+
+                # Update progress bar
+                if progress_bar is not None:
+                    progress_bar.progress(done / total_tools)
+
+                # Update message placeholder
+                if message_placeholder is not None:
+                    remaining_tools = total_tools - done
+                    message_placeholder.write(
+                        f"**Generating descriptions for {remaining_tools} tool(s), it may take {math.ceil(remaining_tools / workers) * 3} seconds...**"
+                    )
+
+    for i, source in duplicates.items():
+        # A failed source fails its duplicates too, with the error adapted the same way.
+        target = descriptions if descriptions[source] is not None else errors
+        target[i] = _reuse_description(
+            target[source], inputs[source]["tool_id"], io_names[source], inputs[i]["tool_id"], io_names[i]
+        )
+
+    # Column lists go straight into the frame's blocks, without a dict per row.
+    return pd.DataFrame({
+        "tool_id": [tool_inputs["tool_id"] for tool_inputs in inputs],
+        "tool_type": [tool_inputs["tool_type"] for tool_inputs in inputs],
+        "description": descriptions,
+        "error": errors,
+    })
+
+
+def _description_entries(tool_ids, df_descriptions, separator=": "):
+    # "Tool <id><separator><description>" per tool, in tool_ids order; the first
+    # description of a repeated tool_id wins. Failed tools (empty or missing
+    # description, see generate_tool_descriptions) count as having none.
+    desc_map = df_descriptions.drop_duplicates("tool_id").set_index("tool_id")["description"].to_dict()
+    return [
+        f"Tool {tool_id}{separator}{desc_map[tool_id]}" if isinstance(desc_map.get(tool_id), str) and desc_map[tool_id]
+        else f"Tool {tool_id}: No description available"
+        for tool_id in tool_ids
+    ]
+
+
+def _join_descriptions(tool_ids, df_descriptions, separator=": "):
+    """
+    Join the descriptions of tool_ids, in that order, into one prompt block.
+
+    Parameters:
+        tool_ids (list): Tool IDs to include.
+        df_descriptions (pd.DataFrame): DataFrame containing 'tool_id' and 'description' columns;
+                                        the first description of a repeated tool_id wins.
+        separator (str): Text between "Tool <id>" and its description.
+
+    Returns:
+        str: "Tool <id><separator><description>" entries separated by blank lines.
+    """
+    return "\n\n".join(_description_entries(tool_ids, df_descriptions, separator))
+
+
+def _split_by_tokens(entries, model, budget=_DESCRIPTIONS_TOKEN_BUDGET):
+    """
+    Group consecutive description entries into shards of at most `budget` tokens.
+
+    Returns a single shard when everything fits; an entry larger than the budget
+    gets a shard of its own.
+    """
+    counts = [len(ids) for ids in encoding_for(model).encode_batch(entries, disallowed_special=())]
+    if sum(counts) <= budget:
+        return [entries]
+    shards, shard, used = [], [], 0
+    for entry, count in zip(entries, counts):
+        if shard and used + count > budget:
+            shards.append(shard)
+            shard, used = [], 0
+        shard.append(entry)
+        used += count
+    shards.append(shard)
+    return shards
+
+
+def _shard_header(part, parts):
+    return (
+        f"[Part {part} of {parts}: these are consecutive tools of a larger workflow. "
+        f"Dataframes produced by earlier parts already exist under their names.]\n\n"
+    )
+
+
+def _run_parts(model, temperature, inputs, instructions):
+    """Run one request per shard input concurrently; returns the texts in input order."""
+    with ThreadPoolExecutor(max_workers=min(4, len(inputs))) as executor:
+        return list(executor.map(
+            lambda input_text: _call_responses_api(model, temperature, input_text, instructions=instructions),
+            inputs,
+        ))
+
+
+def _prompt_log(calls):
+    # full_prompt for multi-call results: every prompt that was sent, in order.
+    return "\n\n-----\n\n".join(f"{instructions}\n\n{input_text}" for instructions, input_text in calls)
+
+
+_IMPORT_LINE = re.compile(r"^(?:import\s+\S|from\s+\S+\s+import\s)")
+
+
+def _stitch_code(parts):
+    """Concatenate per-shard scripts, hoisting their top-level imports into one de-duplicated block."""
+    imports, bodies = [], []
+    for part in parts:
+        body = []
+        for line in part.strip().splitlines():
+            if _IMPORT_LINE.match(line):
+                if line not in imports:
+                    imports.append(line)
             else:
-                generated_description = f"Error generating description for tool {row['tool_id']} ({row['tool_type']}): {error_msg}"
+                body.append(line)
+        bodies.append("\n".join(body).strip("\n"))
+    return "\n".join(imports) + "\n\n\n" + "\n\n\n".join(bodies) + "\n"
 
-        results.append({
-            "tool_id": row["tool_id"],
-            "tool_type": row["tool_type"],
-            "description": generated_description
-        })
 
-        # Update progress bar
-        if progress_bar is not None:
-            progress_value += (1 / total_tools)
-            progress_bar.progress(min(max(progress_value, 0.0), 1.0))
+def _generate(model, temperature, input_text, instructions, on_text=None):
+    # Stream only when someone is listening; the plain call is simpler to retry and log.
+    if on_text is None:
+        return _call_responses_api(model, temperature, input_text, instructions=instructions)
+    return _stream_responses_api(model, temperature, input_text, instructions=instructions, on_text=on_text)
 
-        # Update message placeholder
-        if message_placeholder is not None:
-            remaining_tools = total_tools - tool_index - 1
-            message_placeholder.write(
-                f"**Generating descriptions for {remaining_tools} tool(s), it may take {remaining_tools * 3} seconds...**"
-            )
-        
-        # Add a small delay to avoid rate limiting (only if not the last tool)
-        if tool_index < total_tools - 1:
-            time.sleep(0.5)  # 0.5 second delay between API calls
 
-    return pd.DataFrame(results)
+def _combine_input(entries, execution_sequence, extra_user_instructions):
+    # entries: _description_entries(..., separator=": ") of the tools, in order.
+    return _COMBINE_INPUT.format(
+        all_descriptions="\n\n".join(entries),
+        extra_user_instructions=extra_user_instructions or "",
+        execution_sequence=execution_sequence
+    )
+
+
+def _combine_key(model, temperature, input_text):
+    return llm_cache.make_key("structure_guide", model, temperature, input_text)
+
+
+def _build_guide(entries, input_text, execution_sequence, extra_user_instructions, model, temperature, on_text=None):
+    # Returns (guide, full_prompt); input_text is _combine_input(entries, ...), which callers
+    # already need for the prefetch key. Descriptions over the token budget are map-reduced:
+    # one partial guide per shard, then a merge call over the partial guides.
+    extra_user_instructions = extra_user_instructions or ""
+    shards = _split_by_tokens(entries, model)
+    if len(shards) == 1:
+        guide = _generate(model, temperature, input_text, _COMBINE_INSTRUCTIONS, on_text)
+        return guide, f"{_COMBINE_INSTRUCTIONS}\n\n{input_text}"
+
+    print(f"Tool descriptions exceed {_DESCRIPTIONS_TOKEN_BUDGET} tokens; building the guide in {len(shards)} parts")
+    part_inputs = [
+        _COMBINE_INPUT.format(
+            all_descriptions=_shard_header(k, len(shards)) + "\n\n".join(shard),
+            extra_user_instructions=extra_user_instructions,
+            execution_sequence=execution_sequence,
+        )
+        for k, shard in enumerate(shards, start=1)
+    ]
+    partial_guides = _run_parts(model, temperature, part_inputs, _COMBINE_INSTRUCTIONS)
+    merge_input = _MERGE_GUIDE_INPUT.format(
+        partial_guides="\n\n".join(f"## Part {k}\n{guide}" for k, guide in enumerate(partial_guides, start=1)),
+        extra_user_instructions=extra_user_instructions,
+        execution_sequence=execution_sequence,
+    )
+    guide = _generate(model, temperature, merge_input, _MERGE_GUIDE_INSTRUCTIONS, on_text)
+    calls = [(_COMBINE_INSTRUCTIONS, text) for text in part_inputs] + [(_MERGE_GUIDE_INSTRUCTIONS, merge_input)]
+    return guide, _prompt_log(calls)
 
 
-def combine_tool_descriptions(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="", model="gpt-4o", temperature=0.0):
+def prefetch_combined_description(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="", model="gpt-4o", temperature=0.0):
+    """
+    Start the structure guide request in the background, right after the descriptions are ready.
+
+    A later combine_tool_descriptions call with the same arguments picks up this result
+    (waiting for it if still running) instead of calling the API again, so the guide is
+    generated while the user reviews the descriptions. If the descriptions or instructions
+    change in between, the prefetched result is simply never used.
+
+    Parameters: as combine_tool_descriptions.
+    """
+    entries = _description_entries(tool_ids, df_descriptions, ": ")
+    input_text = _combine_input(entries, execution_sequence, extra_user_instructions)
+    key = _combine_key(model, temperature, input_text)
+    with _prefetch_lock:
+        if key in _prefetched:
+            return
+        _prefetched[key] = _prefetch_executor.submit(
+            _build_guide, entries, input_text, execution_sequence, extra_user_instructions, model, temperature
+        )
+        while len(_prefetched) > _MAX_PREFETCHED:
+            _prefetched.pop(next(iter(_prefetched)))
+
+
+def combine_tool_descriptions(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="", model="gpt-4o", temperature=0.0, on_text=None):
     """
     Create a comprehensive Python code structure guide from individual tool descriptions.
+
+    When the descriptions exceed _DESCRIPTIONS_TOKEN_BUDGET tokens, a partial guide is
+    generated per shard of consecutive tools and the partial guides are merged.
     
     Parameters:
         tool_ids (list): A list of tool IDs to combine descriptions for.
@@ -166,222 +1090,38 @@ def combine_tool_descriptions(tool_ids, df_descriptions, execution_sequence="",
         extra_user_instructions (str): Additional instructions for the summary.
         model (str): The LLM model to use.
         temperature (float): Temperature parameter for LLM responses (0.0-2.0).
+        on_text (callable): Optional callback(new_text) that streams the guide as it is generated.
     
     Returns:
         tuple: (code_structure_guide, full_prompt)
     """
-    # Gather descriptions for each tool
-    descriptions = []
-    for tool_id in tool_ids:
-        subset = df_descriptions.loc[df_descriptions["tool_id"] == tool_id, "description"]
-        if not subset.empty:
-            descriptions.append(f"Tool {tool_id}: {subset.iloc[0]}")
-        else:
-            descriptions.append(f"Tool {tool_id}: No description available")
+    entries = _description_entries(tool_ids, df_descriptions, ": ")
+    input_text = _combine_input(entries, execution_sequence, extra_user_instructions)
 
-    all_descriptions = "\n\n".join(descriptions)
-    
-    if not extra_user_instructions:
-        extra_user_instructions = ''
-
-    template = """
-    You are an expert Python data engineer creating a comprehensive code structure guide for converting Alteryx workflows to Python.
-    Below are detailed technical descriptions of individual Alteryx tools that form a data processing pipeline.
-    
-    Individual tool descriptions:
-    {all_descriptions}
-    
-    Additional context: {extra_user_instructions}
-    Execution sequence: {execution_sequence}
-    
-    Your task is to create a detailed Python code structure guide that:
-    1. Analyzes the workflow and suggests optimal Python code organization
-    2. Recommends meaningful variable/function names instead of Alteryx-style names (e.g., 'customer_data_df' instead of 'df_155_Output')
-    3. Identifies opportunities to use Pythonic patterns (loops, list comprehensions, functions)
-    4. Suggests logical function groupings and code structure
-    5. Handles Alteryx-specific patterns that need Python equivalents
-    6. Provides clear guidance on data flow and variable management
-    
-    Structure your response as:
-    
-    ## Workflow Overview
-    [Brief description of the overall data processing purpose in business language]
-    
-    ## Python Code Structure Recommendations
-    
-    ### Function Organization
-    [Recommend how to group multiple tools that are related to each other into functions]
-    [Suggest meaningful names for the output of functions (dataframes/variables), it could be reasonably long to help understand]
-    
-    ### Pythonic Optimizations
-    [Identify and call out opportunities for which tools we might be able to combine into a single function, can be concise because we are using python, loops, list comprehensions, functions, etc., e.g., "For tool ID 13,14,15, Use a loop to process multiple files instead of separate tools"]
-    
-    ### Data Flow Management
-    [Explain how to handle data flow between steps, e.g., "Chain operations using method chaining where possible"]
-    
-    ## Technical Specification: Python Code Structure for Alteryx Workflow Conversion
-
-    ### Phase 1: Data Loading and Cleaning (Organized by Data Topic)
-
-    For the first phase, identify each data topic in the workflow (e.g., customer data, sales data, product data, etc.). For each data topic, all loading, cleaning, and basic transformation steps should be grouped together (possibly within one or more functions per topic). This ensures all relevant preparation for each data source is handled locally and intuitively.
-
-    For each data topic, provide:
-
-    #### Data Topic: [Descriptive Name for Data Topic 1]
-    - **Related Tools**: [List all tool IDs, e.g., 1, 2, 3]
-    - **Description**: Clearly state what this dataset represents and how it is used in the workflow.
-    - **Loading Function Name**: [e.g., `load_and_prepare_customer_data`]
-    - **Input/Output Variable Names**: [e.g., `raw_customer_df`, `cleaned_customer_df`]
-    - **Processing & Python Patterns**: Describe the steps (load data, drop nulls, standardize columns, type conversion, etc.) and mention best practices (e.g., method chaining, explicit type casting).
-    - **Code Example**:
-    ```python
-    def load_and_prepare_customer_data(filepath):
-        # Load dataset
-        customer_df = pd.read_csv(filepath)
-        # Clean and preprocess
-        customer_df = (
-            customer_df.dropna(subset=["customer_id"])
-            .rename(columns=lambda x: x.lower().strip())
-            .astype({{"customer_id": int}})
-            .drop_duplicates()
-        )
-        return customer_df
-    ```
-
-    #### Data Topic: [Descriptive Name for Data Topic 2]
-    - **Related Tools**: [e.g., 4, 5, 6]
-    - **Description**: ...
-    - **Loading Function Name**: ...
-    - **Input/Output Variable Names**: ...
-    - **Processing & Python Patterns**: ...
-    - **Code Example**:
-    ```python
-    # Similar structure as above for each data topic
-    ```
-
-    [Continue for all major data topics identified in the workflow, grouping every tool that loads/cleans/massages each data source.]
-
-    ### Phase 2: Data Processing (Combining and Transforming Data Topics)
-
-    Organize the main data transformation and processing logic into "Processing Units." Each unit should focus on **combining, joining, or further transforming** one or more data topics; these units reflect the main business logic after raw data preparation.
-
-    For each processing unit, provide:
-
-    #### Processing Unit: [Descriptive Name, e.g., Merge Customers and Sales]
-    - **Tools Included**: [e.g., 7, 8, 9]
-    - **Purpose**: High-level description of the logic (e.g., "Join cleaned customer data with sales transactions and filter for 2022 sales.")
-    - **Function Name**: [e.g., `combine_customer_sales`]
-    - **Input/Output Variable Names**: Clearly indicate all inputs and what the output variable should be called (e.g., `cleaned_customer_df`, `sales_df` → `customer_sales_df`).
-    - **Pythonic Patterns**: Recommend method chaining, use of `merge`, aggregation via `groupby.agg`, etc.
-    - **Detailed Steps**: Outline substeps if necessary (e.g., drop/rename columns before/after join, filter criteria, handling left/right join outputs).
-    - **Code Example**:
-    ```python
-    def combine_customer_sales(customers, sales):
-        result = (
-            customers.merge(sales, on="customer_id", how="left")
-            .query("sales_date >= '2022-01-01'")
-        )
-        return result
-    ```
-
-    #### Processing Unit: [e.g., Aggregate Sales by Region]
-    - **Tools Included**: ...
-    - **Purpose**: ...
-    - **Function Name**: ...
-    - **Input/Output Variable Names**: ...
-    - **Pythonic Patterns**: ...
-    - **Detailed Steps**: ...
-    - **Code Example**:
-    ```python
-    # Example here as above
-    ```
-
-    [Continue this format for each further major transformation step or business logic unit, referencing all included tool IDs.]
-
-    ### Phase 3: Data Output
-
-    For the output phase, specify all logic relating to exporting or saving final results. For each distinct output, provide:
-
-    - **Tools Included**: [e.g., output tool IDs]
-    - **Description**: What does the output represent? Where should it be saved?
-    - **Output Function Name**: [e.g., `export_final_results`]
-    - **Input Variable Name**: [e.g., `final_aggregated_df`]
-    - **Python Patterns**: e.g., `df.to_csv`, `df.to_excel`, robust file naming, error handling.
-    - **Code Example**:
-    ```python
-    def export_final_results(final_df, output_path):
-        final_df.to_csv(output_path, index=False)
-    ```
-
-    [Repeat as necessary for all output steps.]
-
-    ---
-    **General Principles:**
-    - All code sections above should include robust error handling and comments.
-    - Avoid Alteryx-like variable names in function and variable naming; use intuitive business-driven names.
-    - Do **not** introduce column prefixes like "Left_" or "Right_" during joins; instead, pre-rename columns if necessary before joining.
-    - Group code so that data engineers can intuitively work with, extend, or refactor logic relating to each data topic and each core workflow unit.
-    
-    ## Alteryx to Python Conversions
-    
-    ### Key Differences to Handle
-    - **Multiple Outputs**: Alteryx tools like joins, filters, etc. can have multiple outputs, Python will have less.
-    - **Iterative Operations**: Use loops instead of multiple similar tools
-    - **Variable Scope**: Plan variable names and scope carefully
-    - **Error Handling**: Add appropriate try-catch blocks with clear error messages indicate which step is failing.
-    
-    ### Recommended Code Structure
-    # High-Level Python Code Structure (Natural Language Guide)
-    - **Data Loading Phase**: Begin by loading all required input datasets using dedicated functions. If multiple tools load data from similar sources, group them into a single function or logical block. Assign clear, descriptive variable names to each loaded DataFrame.
-    - **Preprocessing & Cleaning**: Organize all data cleaning and preprocessing steps into one or more functions. If several tools perform similar cleaning operations (e.g., filtering, type conversion), consider combining them into a single function with parameters.
-    - **Transformation & Processing**: For tools that transform or join data, group related operations together. If multiple tools operate on the same DataFrame or perform sequential transformations, chain these steps within a function. For complex workflows, break down processing into logical phases (e.g., "customer enrichment", "sales aggregation").
-    - **Data Merging & Joins**: If the workflow includes multiple join or union tools, describe how to consolidate these into fewer, well-structured merge operations in Python. Remove unnecessary column prefixes (like "Right_") and handle multiple outputs by returning tuples or using clear variable names.
-    - **Iterative or Repetitive Operations**: Where the workflow uses repeated tools for similar tasks (e.g., multiple filters or formulas), use Python loops or list comprehensions to generalize the logic.
-    - **Output Phase**: Collect all output steps at the end of the workflow. Use dedicated functions for writing or exporting data, and ensure variable names reflect the output content.
-    - **Workflow Orchestration**: Don't use `main()` function to orchestrate the overall workflow since we start with Jupyter Notebook, calling each phase in the correct order as determined by the execution sequence. Pass DataFrames between functions as needed, and document the data flow.
-    - **Error Handling**: Add try-except blocks around major workflow phases to catch and report errors, indicating which step failed.
-    - **Modularity & Reusability**: Structure the code so that each logical phase (loading, cleaning, processing, output) is encapsulated in a function. This makes the code easier to test and maintain.
-    - **Example**:  
-      - `def load_customer_data()`
-      - `def clean_sales_data(sales_df)`
-      - `def join_customer_sales(customer_df, sales_df)`
-      - `def aggregate_sales_by_region(joined_df)`
-      - `def export_results(final_df)`
-    
-    ## Implementation Notes
-    [Specific notes about implementation details, potential challenges, and best practices]
-    
-    # Most important instructions (You should mention this when try to combine the code in Phase 2 above, and also include this in the final result.):
-    Try your best to not use column names like "Right_" or "Left_" after join in the code structure guide, just use the column names as they are. When conduct join, if columns need to be dropped or renamed, please do before the join instead of introduce "Right_" or "Left_" columns. 
-    Don't profiling/visualize the data, we only need the data to be processed.
-
-    Provide only the detailed code structure guide below:
-    """
-
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence"],
-        template=template
-    )
-
-    combined_description = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence,
-    )
+    with _prefetch_lock:
+        prefetched = _prefetched.pop(_combine_key(model, temperature, input_text), None)
+    if prefetched is not None:
+        try:
+            combined_description, full_prompt = prefetched.result()
+            print("Using the prefetched workflow structure guide")
+            if on_text is not None:
+                on_text(combined_description)
+            return combined_description, full_prompt
+        except Exception as e:
+            print(f"Prefetched structure guide failed, requesting it again: {e}")
 
-    full_prompt = prompt.format(
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence
+    return _build_guide(
+        entries, input_text, execution_sequence, extra_user_instructions, model, temperature, on_text
     )
 
-    return combined_description, full_prompt
 
-
-def generate_final_python_code(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="", workflow_description="", model="gpt-4o", temperature=0.0):
+def generate_final_python_code(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="", workflow_description="", model="gpt-4o", temperature=0.0, on_text=None):
     """
     Generate working Python code by combining detailed tool descriptions and code structure guidance.
+
+    When the descriptions exceed _DESCRIPTIONS_TOKEN_BUDGET tokens, code is generated per
+    shard of consecutive tools (each with the full guide) and the scripts are stitched
+    together with their imports hoisted.
     
     Parameters:
         tool_ids (list): A list of tool IDs to generate code for.
@@ -391,88 +1131,32 @@ def generate_final_python_code(tool_ids, df_descriptions, execution_sequence="",
         workflow_description (str): The workflow structure guide generated in step 2.
         model (str): The LLM model to use.
         temperature (float): Temperature parameter for LLM responses (0.0-2.0).
+        on_text (callable): Optional callback(new_text) that streams the code as it is generated.
     
     Returns:
         tuple: (final_python_code, full_prompt)
     """
-    # Gather descriptions for each tool
-    descriptions = []
-    for tool_id in tool_ids:
-        subset = df_descriptions.loc[df_descriptions["tool_id"] == tool_id, "description"]
-        if not subset.empty:
-            descriptions.append(f"Tool {tool_id}:\n{subset.iloc[0]}")
-        else:
-            descriptions.append(f"Tool {tool_id}: No description available")
-
-    all_descriptions = "\n\n".join(descriptions)
-    
-    if not extra_user_instructions:
-        extra_user_instructions = ''
-
-    template = """
-    You are an expert Python data engineer tasked with generating working Python code from detailed Alteryx tool descriptions.
-    
-    Below are detailed technical descriptions of individual Alteryx tools that form a data processing pipeline:
-    
-    {all_descriptions}
-    
-    Additional context: {extra_user_instructions}
-    Execution sequence: {execution_sequence}
-    
-    IMPORTANT: You have access to a detailed workflow structure guide that was generated in step 2. 
-    This guide contains specific recommendations for code organization, variable naming, and Pythonic patterns.
-    You MUST follow and implement the guidance provided in this structure guide:
-    {workflow_description}
-    
-    Your task is to generate complete, working Python code that:
-    1. Implements all the described tools in the correct execution order
-    2. Follows the specific code structure and organization recommendations from the workflow guide
-    3. Uses the suggested variable and function names from the workflow guide
-    4. Implements the Pythonic patterns and optimizations suggested in the workflow guide
-    5. Follows Python best practices and pandas conventions
-    6. Includes proper error handling and logging
-    7. Handles Alteryx-specific patterns that need Python equivalents
-    8. Produces a complete, runnable Python script
-    
-    Requirements:
-    - Strictly follow the workflow structure guide recommendations
-    - Use the suggested variable names and function organization from the guide
-    - Implement the Pythonic patterns and optimizations outlined in the guide
-    - Include all necessary import statements
-    - Add appropriate comments explaining the logic
-    - Handle data types and conversions properly
-    - Implement proper error handling
-    - Use pandas method chaining where beneficial
-    - Follow PEP 8 style guidelines
-    
-    Generate a complete Python script that includes:
-    1. Import statements
-    2. Function definitions following the workflow guide structure
-    3. Main execution logic
-    4. Proper variable management using suggested names
-    5. Comments explaining the business logic
-    Important instructions: Don't generate the code assume it's final. Make sure it's easy to debug and extend. For example, don't run all the functions in a final main function, instead, format the code that we can run it in jupyter notebook, where we can run step by step.
-    Provide only the complete Python code below (no markdown formatting, just pure Python code):
-    """
-
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence", "workflow_description"],
-        template=template
-    )
+    shards = _split_by_tokens(_description_entries(tool_ids, df_descriptions, ":\n"), model)
+    headers = [""] if len(shards) == 1 else [_shard_header(k, len(shards)) for k in range(1, len(shards) + 1)]
+    # Formatted once; the same text is sent and returned as part of full_prompt.
+    inputs = [
+        _FINAL_CODE_INPUT.format(
+            all_descriptions=header + "\n\n".join(shard),
+            extra_user_instructions=extra_user_instructions or "",
+            execution_sequence=execution_sequence,
+            workflow_description=workflow_description
+        )
+        for header, shard in zip(headers, shards)
+    ]
 
-    final_python_code = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence,
-        workflow_description=workflow_description,
-    )
+    if len(inputs) == 1:
+        final_python_code = _generate(model, temperature, inputs[0], _FINAL_CODE_INSTRUCTIONS, on_text)
+    else:
+        print(f"Tool descriptions exceed {_DESCRIPTIONS_TOKEN_BUDGET} tokens; generating code in {len(inputs)} parts")
+        final_python_code = _stitch_code(_run_parts(model, temperature, inputs, _FINAL_CODE_INSTRUCTIONS))
+        if on_text is not None:
+            on_text(final_python_code)
 
-    full_prompt = prompt.format(
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence,
-        workflow_description=workflow_description
-    )
+    full_prompt = _prompt_log([(_FINAL_CODE_INSTRUCTIONS, input_text) for input_text in inputs])
 
-    return final_python_code, full_prompt 
\ No newline at end of file
+    return final_python_code, full_prompt
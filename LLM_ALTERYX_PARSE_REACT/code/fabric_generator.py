@@ -7,18 +7,47 @@ Three-step flow (mirrors description_generator.py):
   3. generate_final_fabric_code      → complete Python implementation
 """
 
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 from langchain_core.prompts import PromptTemplate
 
-from code.prompt_helper import _call_responses_api_from_prompt_template
-from code.fabric_parser import get_activity_config_text, get_activity_io_description
+from code.prompt_helper import _call_responses_api
+from code.fabric_parser import build_activity_io_index, get_activity_config_text, get_activity_io_description
 
 
 # ---------------------------------------------------------------------------
 # Step 1 — Per-activity descriptions
 # ---------------------------------------------------------------------------
 
+# Fixed instructions are sent as the Responses API `instructions`, identical on every
+# call so the prompt cache can reuse them; only the per-activity fields go in the input.
+_ACTIVITY_DESCRIPTION_INSTRUCTIONS = """\
+You are an expert data engineer analyzing a Microsoft Fabric Data Factory pipeline activity.
+Write a concise technical description (max 5 bullet points) for Python reimplementation.
+The activity name, activity type, configuration, data flow and user context are given in the input.
+
+Required format (plain text, no markdown headers):
+- Purpose: [1 sentence — what this activity does in business terms]
+- Inputs: [upstream activity names or data sources]
+- Outputs: [what data/result this produces and where it goes]
+- Operation: [specific operation — copy, transform, notebook call, SQL script, loop, condition, etc. with key parameters]
+- Notes: [table names, notebook names, SQL snippets, retry policy — omit if none]
+
+Rules:
+- Be specific: include exact table names, notebook references, SQL queries, loop variables, conditions.
+- No Python code examples. No JSON/XML detail.
+
+Provide only the 5-bullet description."""
+
+_ACTIVITY_DESCRIPTION_INPUT = """\
+User context: {extra_user_instructions}
+Activity Type: {activity_type}
+Activity Name: {activity_name}
+Data Flow: {io_context}
+Configuration: {config_text}"""
+
+
 def generate_activity_descriptions(
     activities,
     progress_bar=None,
@@ -26,6 +55,7 @@ def generate_activity_descriptions(
     model="gpt-4.1",
     temperature=0.0,
     extra_user_instructions="",
+    max_concurrency=10,
 ):
     """
     Generate concise technical descriptions for each Fabric pipeline activity.
@@ -37,110 +67,56 @@ def generate_activity_descriptions(
         model (str): LLM model to use.
         temperature (float): Temperature (0.0–2.0).
         extra_user_instructions (str): Additional user context.
+        max_concurrency (int): Maximum number of description requests in flight at once.
 
     Returns:
         pd.DataFrame: Columns ['activity_name', 'activity_type', 'description'].
     """
-    template = """
-    You are an expert data engineer analyzing a Microsoft Fabric Data Factory pipeline activity.
-    Write a concise technical description (max 5 bullet points) for Python reimplementation.
-
-    Activity Name: {activity_name}
-    Activity Type: {activity_type}
-    Configuration: {config_text}
-    Data Flow:     {io_context}
-    User context:  {extra_user_instructions}
-
-    Required format (plain text, no markdown headers):
-    - Purpose: [1 sentence — what this activity does in business terms]
-    - Inputs: [upstream activity names or data sources]
-    - Outputs: [what data/result this produces and where it goes]
-    - Operation: [specific operation — copy, transform, notebook call, SQL script, loop, condition, etc. with key parameters]
-    - Notes: [table names, notebook names, SQL snippets, retry policy — omit if none]
-
-    Rules:
-    - Be specific: include exact table names, notebook references, SQL queries, loop variables, conditions.
-    - No Python code examples. No JSON/XML detail.
-
-    Provide only the 5-bullet description:
-    """
-
-    prompt_template = PromptTemplate(
-        input_variables=["activity_name", "activity_type", "config_text", "io_context", "extra_user_instructions"],
-        template=template,
-    )
 
-    results = []
     total = len(activities)
-    progress_value = 0.0
-
-    for i, activity in enumerate(activities):
-        name = activity.get("name", f"Activity_{i}")
-        activity_type = activity.get("type", "Unknown")
-        config_text = get_activity_config_text(activity)
-        io_context = get_activity_io_description(activities, name)
-
-        if message_placeholder:
-            message_placeholder.write(f"Describing activity {i + 1}/{total}: {name} ({activity_type})…")
+    names = [activity.get("name", f"Activity_{i}") for i, activity in enumerate(activities)]
+    types = [activity.get("type", "Unknown") for activity in activities]
+    io_index = build_activity_io_index(activities)
 
+    def describe(i):
         try:
-            description = _call_responses_api_from_prompt_template(
-                prompt_template, model, temperature,
-                activity_name=name,
-                activity_type=activity_type,
-                config_text=config_text,
-                io_context=io_context,
+            input_text = _ACTIVITY_DESCRIPTION_INPUT.format(
                 extra_user_instructions=extra_user_instructions or "",
+                activity_type=types[i],
+                activity_name=names[i],
+                io_context=get_activity_io_description(activities, names[i], io_index),
+                config_text=get_activity_config_text(activities[i]),
+            )
+            return _call_responses_api(
+                model, temperature, input_text, instructions=_ACTIVITY_DESCRIPTION_INSTRUCTIONS
             )
         except Exception as exc:
-            description = f"Error generating description: {exc}"
-
-        results.append({
-            "activity_name": name,
-            "activity_type": activity_type,
-            "description": description,
-        })
+            return f"Error generating description: {exc}"
 
-        if progress_bar is not None:
-            progress_value += 1.0 / total
-            progress_bar.progress(min(progress_value, 1.0))
+    # Activities are described concurrently (no pause between requests; the shared client
+    # retries rate limits), and progress advances as each description arrives.
+    descriptions = [None] * total
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total))) as executor:
+        futures = {executor.submit(describe, i): i for i in range(total)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            descriptions[i] = future.result()
 
-        if i < total - 1:
-            time.sleep(0.3)
+            if message_placeholder:
+                message_placeholder.write(f"Described activity {done}/{total}: {names[i]} ({types[i]})")
+            if progress_bar is not None:
+                progress_bar.progress(done / total)
 
-    return pd.DataFrame(results)
+    return pd.DataFrame({"activity_name": names, "activity_type": types, "description": descriptions})
 
 
 # ---------------------------------------------------------------------------
 # Step 2 — Python/SQL structure guide
 # ---------------------------------------------------------------------------
 
-def combine_fabric_descriptions(
-    activity_names,
-    df_descriptions,
-    execution_sequence="",
-    extra_user_instructions="",
-    model="gpt-4.1",
-    temperature=0.0,
-):
-    """
-    Create a Python/SQL code structure guide from individual activity descriptions.
-
-    Returns:
-        tuple: (structure_guide, full_prompt)
-    """
-    descriptions = []
-    for name in activity_names:
-        subset = df_descriptions.loc[df_descriptions["activity_name"] == name, "description"]
-        if not subset.empty:
-            descriptions.append(f"Activity '{name}': {subset.iloc[0]}")
-        else:
-            descriptions.append(f"Activity '{name}': No description available")
-
-    all_descriptions = "\n\n".join(descriptions)
-    extra_user_instructions = extra_user_instructions or ""
-
-    template = """
+_FABRIC_GUIDE_PROMPT = PromptTemplate(
+    input_variables=["all_descriptions", "execution_sequence", "extra_user_instructions"],
+    template="""
     You are an expert data engineer converting a Microsoft Fabric Data Factory pipeline to Python/PySpark code.
     Below are detailed descriptions of the pipeline activities.
 
@@ -206,60 +182,51 @@ def combine_fabric_descriptions(
     [Credentials, retry logic, error handling recommendations]
 
     Provide only the detailed structure guide below:
-    """
-
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "execution_sequence", "extra_user_instructions"],
-        template=template,
-    )
-
-    structure_guide = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        execution_sequence=execution_sequence,
-        extra_user_instructions=extra_user_instructions,
-    )
-
-    full_prompt = prompt.format(
-        all_descriptions=all_descriptions,
-        execution_sequence=execution_sequence,
-        extra_user_instructions=extra_user_instructions,
-    )
-
-    return structure_guide, full_prompt
+    """,
+)
 
 
-# ---------------------------------------------------------------------------
-# Step 3 — Final Python code
-# ---------------------------------------------------------------------------
-
-def generate_final_fabric_code(
+def combine_fabric_descriptions(
     activity_names,
     df_descriptions,
     execution_sequence="",
     extra_user_instructions="",
-    structure_guide="",
-    model="gpt-5.1-codex",
+    model="gpt-4.1",
     temperature=0.0,
 ):
     """
-    Generate the final Python script for the Fabric pipeline.
+    Create a Python/SQL code structure guide from individual activity descriptions.
 
     Returns:
-        tuple: (final_code, full_prompt)
+        tuple: (structure_guide, full_prompt)
     """
-    descriptions = []
-    for name in activity_names:
-        subset = df_descriptions.loc[df_descriptions["activity_name"] == name, "description"]
-        if not subset.empty:
-            descriptions.append(f"Activity '{name}':\n{subset.iloc[0]}")
-        else:
-            descriptions.append(f"Activity '{name}': No description available")
+    desc_map = df_descriptions.drop_duplicates("activity_name").set_index("activity_name")["description"].to_dict()
+    descriptions = [
+        f"Activity '{name}': {desc_map[name]}" if name in desc_map
+        else f"Activity '{name}': No description available"
+        for name in activity_names
+    ]
 
     all_descriptions = "\n\n".join(descriptions)
     extra_user_instructions = extra_user_instructions or ""
 
-    template = """
+    full_prompt = _FABRIC_GUIDE_PROMPT.format(
+        all_descriptions=all_descriptions,
+        execution_sequence=execution_sequence,
+        extra_user_instructions=extra_user_instructions,
+    )
+    structure_guide = _call_responses_api(model, temperature, full_prompt)
+
+    return structure_guide, full_prompt
+
+
+# ---------------------------------------------------------------------------
+# Step 3 — Final Python code
+# ---------------------------------------------------------------------------
+
+_FINAL_FABRIC_PROMPT = PromptTemplate(
+    input_variables=["all_descriptions", "execution_sequence", "extra_user_instructions", "structure_guide"],
+    template="""
     You are an expert data engineer generating Python code to reproduce a Microsoft Fabric Data Factory pipeline.
 
     Activity descriptions:
@@ -298,26 +265,41 @@ def generate_final_fabric_code(
     - Clear cell-level comments for Jupyter compatibility.
 
     Provide only the Python code below (no markdown fences, pure Python):
+    """,
+)
+
+
+def generate_final_fabric_code(
+    activity_names,
+    df_descriptions,
+    execution_sequence="",
+    extra_user_instructions="",
+    structure_guide="",
+    model="gpt-5.1-codex",
+    temperature=0.0,
+):
     """
+    Generate the final Python script for the Fabric pipeline.
 
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "execution_sequence", "extra_user_instructions", "structure_guide"],
-        template=template,
-    )
+    Returns:
+        tuple: (final_code, full_prompt)
+    """
+    desc_map = df_descriptions.drop_duplicates("activity_name").set_index("activity_name")["description"].to_dict()
+    descriptions = [
+        f"Activity '{name}':\n{desc_map[name]}" if name in desc_map
+        else f"Activity '{name}': No description available"
+        for name in activity_names
+    ]
 
-    final_code = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        execution_sequence=execution_sequence,
-        extra_user_instructions=extra_user_instructions,
-        structure_guide=structure_guide,
-    )
+    all_descriptions = "\n\n".join(descriptions)
+    extra_user_instructions = extra_user_instructions or ""
 
-    full_prompt = prompt.format(
+    full_prompt = _FINAL_FABRIC_PROMPT.format(
         all_descriptions=all_descriptions,
         execution_sequence=execution_sequence,
         extra_user_instructions=extra_user_instructions,
         structure_guide=structure_guide,
     )
+    final_code = _call_responses_api(model, temperature, full_prompt)
 
     return final_code, full_prompt
@@ -161,20 +161,38 @@ def get_activity_config_text(activity: Dict) -> str:
     return config_text
 
 
-def get_activity_io_description(activities: List[Dict], activity_name: str) -> str:
+def build_activity_io_index(activities: List[Dict]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Index the pipeline's dependencies in a single pass, so describing every activity
+    does not rescan all activities once per activity.
+
+    Returns:
+        {activity_name: (depends_on, outputs_to)}; the first activity of a repeated name wins.
+    """
+    index: Dict[str, Tuple[List[str], List[str]]] = {}
+    for a in activities:
+        index.setdefault(a.get("name"), ([d["activity"] for d in a.get("dependsOn", [])], []))
+    for a in activities:
+        # An activity listing the same upstream twice still triggers it once.
+        for upstream in dict.fromkeys(d["activity"] for d in a.get("dependsOn", [])):
+            if upstream in index:
+                index[upstream][1].append(a["name"])
+    return index
+
+
+def get_activity_io_description(
+    activities: List[Dict], activity_name: str, io_index: Optional[Dict[str, Tuple[List[str], List[str]]]] = None
+) -> str:
     """
     Return a human-readable description of what feeds into and out of an activity.
+
+    Pass io_index (from build_activity_io_index) when describing many activities.
     """
-    target = next((a for a in activities if a.get("name") == activity_name), None)
-    if not target:
+    if io_index is None:
+        io_index = build_activity_io_index(activities)
+    if activity_name not in io_index:
         return ""
-
-    depends_on = [d["activity"] for d in target.get("dependsOn", [])]
-    outputs_to = [
-        a["name"]
-        for a in activities
-        if any(d["activity"] == activity_name for d in a.get("dependsOn", []))
-    ]
+    depends_on, outputs_to = io_index[activity_name]
 
     parts: List[str] = []
     if depends_on:
@@ -0,0 +1,121 @@
+"""
+llm_cache.py — persistent exact-match cache for LLM responses.
+
+Responses are stored in a small SQLite file keyed by a BLAKE2b hash of everything that
+determines the answer (model, temperature and the full prompt text), so re-running
+the same tools, or a workflow with identical tool configurations, skips the API call.
+
+Environment:
+    LLM_CACHE_PATH      SQLite file to use (default: <temp dir>/alteryx2python_llm_cache.sqlite3).
+    LLM_CACHE_DISABLED  Set to 1/true/yes to bypass the cache entirely.
+    LLM_CACHE_TTL_DAYS  Entries older than this are treated as misses and replaced (default: 14).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+_DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "alteryx2python_llm_cache.sqlite3")
+
+_lock = threading.Lock()
+_connection = None
+# key -> lock held by the thread currently computing that key (see get_or_compute).
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def enabled():
+    return os.environ.get("LLM_CACHE_DISABLED", "").strip().lower() not in ("1", "true", "yes")
+
+
+def _max_age():
+    try:
+        return float(os.environ.get("LLM_CACHE_TTL_DAYS", "14")) * 86400
+    except ValueError:
+        return 14 * 86400
+
+
+def make_key(*parts):
+    """Stable 128-bit BLAKE2b hex digest of the JSON-serialized parts (ample for a local cache)."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _connect():
+    global _connection
+    if _connection is None:
+        path = os.environ.get("LLM_CACHE_PATH") or _DEFAULT_PATH
+        # Requests run on worker threads; every access goes through _lock.
+        _connection = sqlite3.connect(path, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        _connection.commit()
+    return _connection
+
+
+def get(key, refresh=False):
+    """
+    Return the cached response for key, or None on a miss, an expired entry, when refresh
+    is set (the caller wants a new response), or when the cache is disabled/unavailable.
+    """
+    if refresh or not enabled():
+        return None
+    try:
+        with _lock:
+            row = _connect().execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"LLM cache read failed: {e}")
+        return None
+    if row is None or time.time() - row[1] > _max_age():
+        return None
+    return row[0]
+
+
+def put(key, value):
+    """Store a response; failures are logged and otherwise ignored."""
+    if not enabled() or not value:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"LLM cache write failed: {e}")
+
+
+def get_or_compute(key, compute, refresh=False):
+    """
+    Return the cached response for key, calling compute() and storing its result on a miss
+    (always, when refresh is set).
+
+    Concurrent callers asking for the same key wait for the first one and then read its
+    result from the cache, instead of sending the same request again. If compute()
+    raises, nothing is stored and the error propagates (a waiting caller then retries).
+    """
+    value = get(key, refresh)
+    if value is not None:
+        return value
+    if not enabled():
+        return compute()
+    with _inflight_lock:
+        key_lock = _inflight.setdefault(key, threading.Lock())
+    with key_lock:
+        try:
+            value = get(key, refresh)
+            if value is None:
+                value = compute()
+                put(key, value)
+            return value
+        finally:
+            with _inflight_lock:
+                if _inflight.get(key) is key_lock:
+                    del _inflight[key]
@@ -1,14 +1,23 @@
 # Print working directory
+import functools
+import io
+import json
+import logging
+import math
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 print(os.getcwd())
 
-from code.traverse_helper import get_input_name, get_output_name
+from code.traverse_helper import build_connection_index, get_input_name, get_output_name
 import pandas as pd
 from langchain_core.prompts import PromptTemplate
-from openai import OpenAI
+import httpx
+from openai import DefaultHttpxClient, OpenAI
 
 from code.ToolContextDictionary import comprehensive_guide
+from code.ToolContextTokens import DEFAULT_MODEL, fit_guide
 
 # Use the new Responses API (v1/responses) for all models - supports Codex and chat models.
 # See: https://developers.openai.com/api/docs/guides/migrate-to-responses
@@ -18,33 +27,197 @@ MODELS_WITHOUT_TEMPERATURE = frozenset((
     "gpt-5.1-codex", "gpt-5.1-codex-mini", "gpt-5.1-codex-max",
 ))
 
+# Retries per request for 429s, 5xx and dropped connections. The SDK backs off
+# exponentially (with jitter) and honours Retry-After, so a burst of concurrent
+# description requests slows down instead of failing.
+MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "5"))
+
+# HTTP connection pool of the shared client. httpx keeps only 20 idle connections by
+# default, so a fan-out wider than that (description requests, guide/code shards)
+# would reopen TLS connections on every burst; keep them all alive instead.
+POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=60.0)
+
+
+@functools.lru_cache(maxsize=8)
+def _client_for(api_key, base_url):
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=MAX_RETRIES,
+        http_client=DefaultHttpxClient(limits=POOL_LIMITS),
+    )
+
+
+def _openai_client():
+    """
+    Shared OpenAI client for the current credentials.
+
+    Clients are thread-safe and keep an HTTP connection pool, so reusing one avoids a
+    new TLS handshake per request. The API sets OPENAI_API_KEY per request, so the
+    cache is keyed on the key (and base URL) rather than holding a single client.
+    """
+    return _client_for(os.environ.get("OPENAI_API_KEY"), os.environ.get("OPENAI_BASE_URL"))
+
+
+def warm_up_connection():
+    """
+    Make one cheap authenticated request (list models) with the shared client, so the
+    connection pool already holds an open HTTPS connection for the first real call.
+    Failures are only logged; the real call reports any credential problem.
+    """
+    try:
+        _openai_client().models.list()
+    except Exception as e:
+        print(f"OpenAI connection warm-up failed: {e}")
+
+
+def _responses_request_body(model, temperature, input_text):
+    body = {"model": model, "input": input_text}
+    if temperature is not None and model not in MODELS_WITHOUT_TEMPERATURE:
+        body["temperature"] = temperature
+    return body
+
 
 def _call_responses_api(model, temperature, input_text, instructions=None):
     """
     Call OpenAI Responses API (v1/responses). Works with all models including Codex.
     Omits temperature for models that don't support it (e.g. Codex).
     """
-    client = OpenAI()
-    kwargs = {
-        "model": model,
-        "input": input_text,
-    }
+    client = _openai_client()
+    # Only pass temperature for models that support it (Codex does not).
+    kwargs = _responses_request_body(model, temperature, input_text)
     if instructions:
         kwargs["instructions"] = instructions
-    # Only pass temperature for models that support it (Codex does not).
-    if temperature is not None and model not in MODELS_WITHOUT_TEMPERATURE:
-        kwargs["temperature"] = temperature
     response = client.responses.create(**kwargs)
+    _log_cached_tokens(response)
     return (response.output_text or "").strip()
 
 
-def _call_responses_api_from_prompt_template(prompt_template, model, temperature, **template_vars):
-    """Format a PromptTemplate with template_vars and call the Responses API (input = full prompt)."""
-    full_prompt = prompt_template.format(**template_vars)
-    return _call_responses_api(model, temperature, full_prompt)
+def _log_cached_tokens(response):
+    # Static instructions are sent first so repeated calls share a cacheable prefix;
+    # report when OpenAI actually served part of the prompt from its cache.
+    details = getattr(getattr(response, "usage", None), "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    if cached_tokens:
+        logging.debug("Prompt cache: %s of %s input tokens cached", cached_tokens, response.usage.input_tokens)
+
+
+def _stream_responses_api(model, temperature, input_text, instructions=None, on_text=None, min_interval=0.05):
+    """
+    Streaming variant of _call_responses_api for long outputs.
+
+    Parameters:
+        on_text (callable): Optional callback(new_text) receiving the output as it is generated,
+                            in chunks sent at most every min_interval seconds. The chunks
+                            concatenate to the full (unstripped) output.
+        min_interval (float): Minimum seconds between on_text calls.
+
+    Returns:
+        str: The complete response text, stripped, as _call_responses_api returns it.
+    """
+    client = _openai_client()
+    kwargs = _responses_request_body(model, temperature, input_text)
+    if instructions:
+        kwargs["instructions"] = instructions
+    parts = []
+    sent = 0
+    last_sent = time.monotonic()
+    for event in client.responses.create(stream=True, **kwargs):
+        if event.type == "response.output_text.delta":
+            parts.append(event.delta)
+            now = time.monotonic()
+            if on_text is not None and now - last_sent >= min_interval:
+                on_text("".join(parts[sent:]))
+                sent, last_sent = len(parts), now
+        elif event.type == "response.completed":
+            _log_cached_tokens(event.response)
+        elif event.type == "response.failed":
+            error = getattr(event.response, "error", None)
+            raise RuntimeError(getattr(error, "message", None) or "Response failed")
+        elif event.type == "error":
+            raise RuntimeError(event.message)
+    if on_text is not None and sent < len(parts):
+        on_text("".join(parts[sent:]))
+    return "".join(parts).strip()
+
+
+def _batch_output_text(body):
+    """Concatenate the output_text parts of a raw Responses API JSON body."""
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output", [])
+        if item.get("type") == "message"
+        for part in item.get("content", [])
+        if part.get("type") == "output_text"
+    ).strip()
+
+
+def _run_responses_batch(model, temperature, prompts, instructions=None, on_poll=None, initial_poll=5.0, max_poll=60.0):
+    """
+    Run many Responses API requests through the OpenAI Batch API (half price, 24h window).
+
+    Parameters:
+        model (str): The LLM model to use.
+        temperature (float): Temperature parameter for LLM responses (omitted for models without it).
+        prompts (dict): custom_id (str) -> prompt input text.
+        instructions (str | dict): Optional instructions, either shared by every request or
+                                   given per custom_id.
+        on_poll (callable): Optional callback(completed, total) invoked after every status poll.
+        initial_poll (float): First polling interval in seconds; grows by 1.5x up to max_poll.
+        max_poll (float): Longest polling interval in seconds.
+
+    Returns:
+        dict: custom_id -> response text for the requests that succeeded. Failed or expired
+              requests are absent, so the caller decides how to report them.
+    """
+    client = _openai_client()
+    lines = []
+    for custom_id, prompt in prompts.items():
+        body = _responses_request_body(model, temperature, prompt)
+        request_instructions = instructions.get(custom_id) if isinstance(instructions, dict) else instructions
+        if request_instructions:
+            body["instructions"] = request_instructions
+        lines.append(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/responses", "body": body}))
+    batch_file = client.files.create(
+        file=("batch_input.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+
+    delay = initial_poll
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_poll)
+        batch = client.batches.retrieve(batch.id)
+        if on_poll is not None and batch.request_counts is not None:
+            on_poll(batch.request_counts.completed, batch.request_counts.total)
+
+    results = {}
+    # Expired batches still return the requests that finished inside the window.
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = _batch_output_text(response.get("body") or {})
+    return results
+
+
+_ORDINAL_SUFFIXES = {1: "st", 2: "nd", 3: "rd"}
+
 
+def _ordinal(n):
+    # "1st", "2nd", "3rd", then "<n>th"; tools rarely have more than a few outputs.
+    return f"{n}{_ORDINAL_SUFFIXES.get(n, 'th')}"
 
-def create_tool_io_template(df_connections, tool_id):
+
+def create_tool_io_template(df_connections, tool_id, connection_index=None):
     """
     For a given tool_id, create a template string describing its inputs and outputs.
     The template will use get_input_name and get_output_name to obtain the names.
@@ -52,44 +225,79 @@ def create_tool_io_template(df_connections, tool_id):
     Example output:
     "This tool (tool id 583) has 2 input(s): df_580_Output connects to the 'Left', df_582_Output connects to the 'Right'.
      And the 1st output is df_583_Join."
+
+    Pass connection_index (from build_connection_index) when generating code for many
+    tools to avoid scanning df_connections once per tool.
     """
     # Use the helper functions to get input and output names
-    input_details = get_input_name(df_connections, tool_id)
-    output_details = get_output_name(df_connections, tool_id)
+    if connection_index is None:
+        input_details = get_input_name(df_connections, tool_id)
+        output_details = get_output_name(df_connections, tool_id)
+    else:
+        inputs_by_tool, outputs_by_tool = connection_index
+        input_details = inputs_by_tool.get(tool_id, [])
+        output_details = outputs_by_tool.get(tool_id, [])
 
     num_inputs = len(input_details)
     # Build input details string
     if num_inputs == 0:
         input_str = "No inputs"
     else:
-        input_str_list = [f"{inp} connects to the '{typ}'" for inp, typ in input_details]
-        input_str = ", ".join(input_str_list)
+        input_str = ", ".join(f"{inp} connects to the '{typ}'" for inp, typ in input_details)
 
     # Build output details string with ordinal numbers
-    num_outputs = len(output_details)
-    if num_outputs == 0:
+    if not output_details:
         output_str = "No outputs"
     else:
-        output_str_list = []
-        for i, out in enumerate(output_details):
-            # Determine ordinal representation
-            if i == 0:
-                ordinal = "1st"
-            elif i == 1:
-                ordinal = "2nd"
-            elif i == 2:
-                ordinal = "3rd"
-            else:
-                ordinal = f"{ i +1}th"
-            output_str_list.append(f"name the {ordinal} output as {out}")
-        output_str = ", ".join(output_str_list)
+        output_str = ", ".join(
+            f"name the {_ordinal(i)} output as {out}" for i, out in enumerate(output_details, start=1)
+        )
 
     template_text = (f"This tool with id {tool_id} has {num_inputs} input(s), their variable name is {input_str}. Use {input_str} as the input for this tool "
                      f"And {output_str}.")
     return template_text
 
 
-def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0, extra_user_instructions=""):
+# Per-tool code prompt. The fixed rules and the tool guide go in the instructions, so
+# every tool of one type sends the same prefix; only the short per-tool input varies.
+_TOOL_CODE_INSTRUCTIONS = """\
+You are an expert data engineer. Convert the Alteryx tool configuration in the input into equivalent Python code using open-source libraries.
+The tool type, configuration details, I/O details and user instructions are given in the input.
+When a guide for the tool type exists it follows these instructions; refer to it for this tool.
+In the <DefaultAnnotationText> element, there is a text field that contains the high level description of the tool but it could be empty. You can keep it as comment in the code.
+
+Rules:
+1. Please return only the Python code that reproduces the functionality of this tool.
+2. Include import statements as a comments.
+3. Don't include any function definitions or docstrings.
+4. Don't include sample data, just the code."""
+
+# Filled with str.format: the fields are fixed, so PromptTemplate's per-call
+# validation buys nothing in this per-tool loop.
+_TOOL_CODE_INPUT = """\
+User instructions: {extra_user_instructions}
+Tool type: {tool_type}
+I/O details: {io_info}
+Configuration details: {config_text}"""
+
+
+# Largest tool guide appended to a per-tool prompt, in tokens of the target model. Every
+# guide fits today; a longer one is trimmed (notes, then examples) instead of growing
+# every request for that tool type.
+_GUIDE_TOKEN_BUDGET = 4000
+
+
+def _with_guide(instructions, tool_name, config_text, model=DEFAULT_MODEL):
+    # Append the tool's guide (worked examples matched to config_text) when there is one.
+    guide = fit_guide(tool_name, _GUIDE_TOKEN_BUDGET, model, examples_matching=config_text)
+    if not guide:
+        if tool_name in comprehensive_guide:
+            print(f"Guide for {tool_name} exceeds {_GUIDE_TOKEN_BUDGET} tokens even without examples; omitting it")
+        return instructions
+    return f"{instructions}\n\nTool guide:\n{guide}"
+
+
+def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=None, message_placeholder=None, model="gpt-4o", temperature=0.0, extra_user_instructions="", max_concurrency=10):
     """
     Convert Alteryx tool configurations in a DataFrame to equivalent Python code,
     incorporating I/O details so the LLM knows which dataframes are expected.
@@ -101,74 +309,79 @@ def generate_python_code_from_alteryx_df(df_nodes, df_connections, progress_bar=
         message_placeholder: Optional message placeholder widget for UI feedback.
         model (str): The LLM model to use for code generation.
         temperature (float): Temperature parameter for LLM responses (0.0-2.0).
+        max_concurrency (int): Maximum number of code requests in flight at once.
 
     Returns:
         pd.DataFrame: A DataFrame with columns 'tool_id', 'tool_type', and 'python_code'.
     """
-    # Define a prompt template with an additional_instructions placeholder.
-    template = """
-    You are an expert data engineer. Convert the following Alteryx tool configuration into equivalent Python code using open-source libraries.
-    Tool type: {tool_type}
-    Configuration details: {config_text}
-    I/O details: {io_info}
-    Additional instructions: {additional_instructions} In the <DefaultAnnotationText> element, there is a text field that contains the high level description of the tool but it could be empty. You can keep it as comment in the code.
-    User instructions: {extra_user_instructions}
-
-    Rules:
-    1. Please return only the Python code that reproduces the functionality of this tool.
-    2. Include import statements as a comments.
-    3. Don't include any function definitions or docstrings.
-    4. Don't include sample data, just the code.
-    """
-
-    prompt_template = PromptTemplate(
-        input_variables=["tool_type", "config_text", "io_info", "additional_instructions", "extra_user_instructions"],
-        template=template
-    )
-
-    results = []
     total_tools = len(df_nodes)  # Total number of tools to process
-    rest_tools = total_tools
-    progress_value = 0.05  # Initial progress value
-    # Process each node in the DataFrame (using Responses API).
-    for index, row in df_nodes.iterrows():
-        tool_name = row["tool_type"]
-        # Inject additional instructions if available in the dictionary.
-        additional_instructions = (
-            f'Refer to this additional information for "{tool_name}" tool - {comprehensive_guide[tool_name]}'
-            if tool_name in comprehensive_guide else ""
-        )
-        # Create the I/O description using the helper function.
-        io_info = create_tool_io_template(df_connections, row["tool_id"])
+    connection_index = build_connection_index(df_connections)
+    rows = list(df_nodes.itertuples(index=False))
 
-        generated_code = _call_responses_api_from_prompt_template(
-            prompt_template, model, temperature,
-            tool_type=row["tool_type"],
-            config_text=row["text"],
-            io_info=io_info,
-            additional_instructions=additional_instructions,
+    def generate(row):
+        # Create the I/O description using the helper function.
+        io_info = create_tool_io_template(df_connections, row.tool_id, connection_index)
+        input_text = _TOOL_CODE_INPUT.format(
             extra_user_instructions=extra_user_instructions or "",
+            tool_type=row.tool_type,
+            io_info=io_info,
+            config_text=row.text,
         )
+        return _call_responses_api(
+            model, temperature, input_text,
+            instructions=_with_guide(_TOOL_CODE_INSTRUCTIONS, row.tool_type, row.text, model),
+        )
+
+    # Tools are independent, so their requests run concurrently; results are stored
+    # by position and progress is reported as each one finishes, in any order.
+    generated = [None] * total_tools
+    workers = max(1, min(max_concurrency, total_tools))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate, row): n for n, row in enumerate(rows)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            generated[futures[future]] = future.result()
+
+            # Update progress bar
+            if progress_bar is not None:
+                progress_bar.progress(0.05 + done / total_tools * 0.8)
+
+            rest_tools = total_tools - done
+            # Update message_placeholder
+            if message_placeholder is not None:
+                message_placeholder.write(
+                    f"**Generating code for {rest_tools} tool(s), it may take {math.ceil(rest_tools / workers) * 4} seconds...**")
+
+    return pd.DataFrame({
+        "tool_id": [row.tool_id for row in rows],
+        "tool_type": [row.tool_type for row in rows],
+        "python_code": generated,
+    })
+
+
+# Instructs the LLM to merge the per-tool code snippets into one script.
+_COMBINE_CODE_PROMPT = PromptTemplate(
+    input_variables=["all_tool_code", "extra_user_instructions", "execution_sequence"],
+    template="""
+    You are an expert data engineer. We have multiple python code snippets translated from different Alteryx tools, and we want to combine them into a single coherent Python script.
 
-        results.append({
-            "tool_id": row["tool_id"],
-            "tool_type": row["tool_type"],
-            "python_code": generated_code
-        })
+    Code snippets:
+    {all_tool_code}
 
+    Extra user instructions: {extra_user_instructions}
 
-        # Update progress bar
-        if progress_bar is not None:
-            progress_value += (1 / total_tools)*0.8
-            progress_bar.progress(min(max(progress_value, 0.0), 1.0))  # Clamp the value between 0.0 and 1.0
+    Requirements:
+    1. Please return only the combined Python script, don't use ```python ``` to make it a code block. Just return the code.
+    2. Do not add any import statements for common packages (Assume they exist), for self-build functions, include import statement as comments
+    3. Do not write function definitions or docstrings unless needed to chain code together.
+    4. Merge them in a logical order that respects typical data processing flow (if possible).
+    5. Eliminate redundant or conflicting statements.
+    6. Add concise comment to help understand the code.
+    7. When combining the tools snippets, please strictly follow the order here: {execution_sequence}
 
-        rest_tools -= 1
-        # Update message_placeholder
-        if message_placeholder is not None:
-            message_placeholder.write(
-                f"**Generating code for {rest_tools} tool(s), it may take {rest_tools * 4} seconds...**")
 
-    return pd.DataFrame(results)
+    Provide only the merged code below:
+    """,
+)
 
 
 def combine_python_code_of_tools(tool_ids, df_generated_code, execution_sequence="",extra_user_instructions="", model="gpt-4o", temperature=0.0):
@@ -190,14 +403,10 @@ def combine_python_code_of_tools(tool_ids, df_generated_code, execution_sequence
 
     # 1) Gather the code snippets for each tool in the specified order.
     #    We'll just concatenate them in the prompt for the LLM.
-    code_snippets = []
-    for tool_id in tool_ids:
-        # Filter for the row matching this tool_id
-        subset = df_generated_code.loc[df_generated_code["tool_id"] == tool_id, "python_code"]
-        if not subset.empty:
-            code_snippets.append(subset.iloc[0])
-        else:
-            code_snippets.append(f"# No code found for tool {tool_id}")
+    #    One dict lookup per tool instead of a boolean mask over the whole frame;
+    #    the first snippet of a repeated tool_id wins.
+    code_map = df_generated_code.drop_duplicates("tool_id").set_index("tool_id")["python_code"].to_dict()
+    code_snippets = [code_map.get(tool_id, f"# No code found for tool {tool_id}") for tool_id in tool_ids]
 
     # Create a single string with all code snippets.
     all_tool_code = "\n\n".join(
@@ -205,45 +414,13 @@ def combine_python_code_of_tools(tool_ids, df_generated_code, execution_sequence
     )
     if not extra_user_instructions:
         extra_user_instructions = ''
-    # 2) Create a prompt template that instructs the LLM to merge the code snippets.
-    template = """
-    You are an expert data engineer. We have multiple python code snippets translated from different Alteryx tools, and we want to combine them into a single coherent Python script.
 
-    Code snippets:
-    {all_tool_code}
-
-    Extra user instructions: {extra_user_instructions}
-
-    Requirements:
-    1. Please return only the combined Python script, don't use ```python ``` to make it a code block. Just return the code.
-    2. Do not add any import statements for common packages (Assume they exist), for self-build functions, include import statement as comments
-    3. Do not write function definitions or docstrings unless needed to chain code together.
-    4. Merge them in a logical order that respects typical data processing flow (if possible).
-    5. Eliminate redundant or conflicting statements.
-    6. Add concise comment to help understand the code.
-    7. When combining the tools snippets, please strictly follow the order here: {execution_sequence}
-
-
-    Provide only the merged code below:
-    """
-
-    prompt = PromptTemplate(
-        input_variables=["all_tool_code", "extra_user_instructions", "execution_sequence"],
-        template=template
-    )
-
-    # 3) Call Responses API to combine the code.
-    merged_code = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_tool_code=all_tool_code,
-        execution_sequence=execution_sequence,
-        extra_user_instructions=extra_user_instructions,
-    )
-
-    full_prompt = prompt.format(
+    # 2) Call Responses API to combine the code.
+    full_prompt = _COMBINE_CODE_PROMPT.format(
         all_tool_code=all_tool_code,
         extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence
+        execution_sequence=execution_sequence,
     )
+    merged_code = _call_responses_api(model, temperature, full_prompt)
 
     return merged_code, full_prompt
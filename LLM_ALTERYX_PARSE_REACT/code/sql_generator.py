@@ -5,17 +5,40 @@ Functions for converting Alteryx workflow tools to SQL CTEs.
 """
 
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 from langchain_core.prompts import PromptTemplate
 
-from code.ToolContextDictionary import comprehensive_guide
-from code.traverse_helper import get_input_name, get_output_name
-from code.prompt_helper import _call_responses_api_from_prompt_template
-from code.description_generator import create_tool_io_description
+from code.traverse_helper import build_connection_index
+from code.prompt_helper import _call_responses_api, _with_guide
+from code.description_generator import _generate, _join_descriptions, _truncate_to_tokens, create_tool_io_description
+
+
+# Fixed rules (plus the tool guide, see _with_guide) go in the instructions and only
+# the per-tool fields in the input, as for the per-tool Python code prompt.
+_TOOL_SQL_INSTRUCTIONS = """\
+You are an expert SQL data engineer. Convert the Alteryx tool configuration in the input into an equivalent SQL CTE snippet.
+The tool type, configuration details, I/O details and user instructions are given in the input.
+When a guide for the tool type exists it follows these instructions; refer to it for this tool.
+
+Rules:
+1. Return only a SQL CTE fragment in the form: <output CTE name> AS (SELECT ...), using the output CTE name from the I/O details.
+2. Use the input CTEs referenced in the I/O details as your FROM / JOIN sources.
+3. Do not include CREATE TABLE or INSERT statements — only the CTE expression.
+4. Do not wrap in markdown code fences.
+5. Use standard ANSI SQL that works in most databases (Snowflake, BigQuery, Postgres, etc.).
+6. Keep column names clean — no "Left_" or "Right_" prefixes; rename before joining if needed."""
+
+_TOOL_SQL_INPUT = """\
+User instructions: {extra_user_instructions}
+Tool type: {tool_type}
+I/O details: {io_info}
+Configuration details: {config_text}"""
 
 
 def generate_sql_for_tool(df_nodes, df_connections, progress_bar=None, message_placeholder=None,
-                           model="gpt-4.1", temperature=0.0, extra_user_instructions=""):
+                           model="gpt-4.1", temperature=0.0, extra_user_instructions="", max_concurrency=10):
     """
     Convert Alteryx tool configurations into SQL CTE snippets.
 
@@ -27,111 +50,67 @@ def generate_sql_for_tool(df_nodes, df_connections, progress_bar=None, message_p
         model (str): LLM model.
         temperature (float): Temperature (0.0–2.0).
         extra_user_instructions (str): Additional instructions.
+        max_concurrency (int): Maximum number of SQL requests in flight at once.
 
     Returns:
         pd.DataFrame: Columns 'tool_id', 'tool_type', 'sql_code'.
     """
-    template = """
-    You are an expert SQL data engineer. Convert the following Alteryx tool configuration into an equivalent SQL CTE snippet.
-
-    Tool type: {tool_type}
-    Configuration details: {config_text}
-    I/O details: {io_info}
-    Additional instructions: {additional_instructions}
-    User instructions: {extra_user_instructions}
-
-    Rules:
-    1. Return only a SQL CTE fragment in the form: cte_{tool_id} AS (SELECT ...)
-    2. Use the input CTEs referenced in the I/O details as your FROM / JOIN sources.
-    3. Do not include CREATE TABLE or INSERT statements — only the CTE expression.
-    4. Do not wrap in markdown code fences.
-    5. Use standard ANSI SQL that works in most databases (Snowflake, BigQuery, Postgres, etc.).
-    6. Keep column names clean — no "Left_" or "Right_" prefixes; rename before joining if needed.
-    """
-
-    prompt_template = PromptTemplate(
-        input_variables=["tool_type", "config_text", "io_info", "additional_instructions",
-                         "extra_user_instructions", "tool_id"],
-        template=template
-    )
 
-    results = []
     total_tools = len(df_nodes)
-    progress_value = 0.05
-
-    for index, row in df_nodes.iterrows():
-        tool_name = row["tool_type"]
-        tool_id = str(row["tool_id"])
-
-        additional_instructions = (
-            f'Refer to this additional information for "{tool_name}" tool - {comprehensive_guide[tool_name]}'
-            if tool_name in comprehensive_guide else ""
-        )
+    inputs_by_tool, _ = build_connection_index(df_connections)
+    # Cut by tokens, with the same limit as the description step, rather than by characters
+    truncated_texts = _truncate_to_tokens(df_nodes["text"].astype(str).tolist(), model)
+    rows = list(df_nodes.itertuples(index=False))
 
+    def generate(row, config_text):
+        tool_id = str(row.tool_id)
         # Build IO info for SQL: use CTE names instead of df_ variable names
-        input_details = get_input_name(df_connections, row["tool_id"])
-        output_details = get_output_name(df_connections, row["tool_id"])
-
+        input_details = inputs_by_tool.get(row.tool_id, [])
         if input_details:
             input_ctes = [f"cte_{inp[0].replace('df_', '').split('_Output')[0]}" for inp in input_details]
             io_info = f"Input CTEs: {', '.join(input_ctes)}. Output CTE name: cte_{tool_id}."
         else:
             io_info = f"No inputs (this is a source/input tool). Output CTE name: cte_{tool_id}."
 
-        config_text = str(row["text"])
-        if len(config_text) > 3000:
-            config_text = config_text[:3000] + "… [truncated]"
-
-        if message_placeholder is not None:
-            message_placeholder.write(f"Generating SQL for tool {tool_id} ({tool_name})…")
-
-        generated_sql = _call_responses_api_from_prompt_template(
-            prompt_template, model, temperature,
-            tool_type=tool_name,
-            config_text=config_text,
-            io_info=io_info,
-            additional_instructions=additional_instructions,
+        input_text = _TOOL_SQL_INPUT.format(
             extra_user_instructions=extra_user_instructions or "",
-            tool_id=tool_id,
+            tool_type=row.tool_type,
+            io_info=io_info,
+            config_text=config_text,
+        )
+        return _call_responses_api(
+            model, temperature, input_text,
+            instructions=_with_guide(_TOOL_SQL_INSTRUCTIONS, row.tool_type, row.text, model),
         )
 
-        results.append({
-            "tool_id": row["tool_id"],
-            "tool_type": tool_name,
-            "sql_code": generated_sql,
-        })
-
-        if progress_bar is not None:
-            progress_value += (1 / total_tools) * 0.8
-            progress_bar.progress(min(max(progress_value, 0.0), 1.0))
-
-    return pd.DataFrame(results)
-
-
-def combine_sql_of_tools(tool_ids, df_generated_sql, execution_sequence="",
-                          extra_user_instructions="", model="gpt-5.1-codex", temperature=0.0):
-    """
-    Combine per-tool SQL CTEs into a single final SQL script with a SELECT statement.
-
-    Returns:
-        tuple: (final_sql, full_prompt)
-    """
-    cte_snippets = []
-    for tool_id in tool_ids:
-        subset = df_generated_sql.loc[df_generated_sql["tool_id"] == tool_id, "sql_code"]
-        if not subset.empty:
-            cte_snippets.append(subset.iloc[0])
-        else:
-            cte_snippets.append(f"-- No SQL generated for tool {tool_id}")
-
-    all_ctes = "\n\n".join(
-        f"-- Tool {tid}\n{snippet}" for tid, snippet in zip(tool_ids, cte_snippets)
-    )
-
-    if not extra_user_instructions:
-        extra_user_instructions = ""
-
-    template = """
+    # Same concurrent pattern as prompt_helper.generate_python_code_from_alteryx_df.
+    generated = [None] * total_tools
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total_tools))) as executor:
+        futures = {
+            executor.submit(generate, row, config_text): n
+            for n, (row, config_text) in enumerate(zip(rows, truncated_texts))
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            n = futures[future]
+            generated[n] = future.result()
+
+            if message_placeholder is not None:
+                message_placeholder.write(
+                    f"Generated SQL for tool {rows[n].tool_id} ({rows[n].tool_type}) — {done}/{total_tools}"
+                )
+            if progress_bar is not None:
+                progress_bar.progress(0.05 + done / total_tools * 0.8)
+
+    return pd.DataFrame({
+        "tool_id": [row.tool_id for row in rows],
+        "tool_type": [row.tool_type for row in rows],
+        "sql_code": generated,
+    })
+
+
+_COMBINE_SQL_PROMPT = PromptTemplate(
+    input_variables=["all_ctes", "execution_sequence", "extra_user_instructions"],
+    template="""
     You are an expert SQL data engineer. Combine the following per-tool SQL CTE snippets into a single, clean SQL script.
 
     Per-tool CTEs:
@@ -150,52 +129,41 @@ def combine_sql_of_tools(tool_ids, df_generated_sql, execution_sequence="",
     7. Keep column names clean (no "Left_" / "Right_" prefixes).
 
     Provide only the final combined SQL below:
+    """,
+)
+
+
+def combine_sql_of_tools(tool_ids, df_generated_sql, execution_sequence="",
+                          extra_user_instructions="", model="gpt-5.1-codex", temperature=0.0):
+    """
+    Combine per-tool SQL CTEs into a single final SQL script with a SELECT statement.
+
+    Returns:
+        tuple: (final_sql, full_prompt)
     """
+    sql_map = df_generated_sql.drop_duplicates("tool_id").set_index("tool_id")["sql_code"].to_dict()
+    cte_snippets = [sql_map.get(tool_id, f"-- No SQL generated for tool {tool_id}") for tool_id in tool_ids]
 
-    prompt = PromptTemplate(
-        input_variables=["all_ctes", "execution_sequence", "extra_user_instructions"],
-        template=template
+    all_ctes = "\n\n".join(
+        f"-- Tool {tid}\n{snippet}" for tid, snippet in zip(tool_ids, cte_snippets)
     )
 
-    final_sql = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_ctes=all_ctes,
-        execution_sequence=execution_sequence,
-        extra_user_instructions=extra_user_instructions,
-    )
+    if not extra_user_instructions:
+        extra_user_instructions = ""
 
-    full_prompt = prompt.format(
+    full_prompt = _COMBINE_SQL_PROMPT.format(
         all_ctes=all_ctes,
         execution_sequence=execution_sequence,
         extra_user_instructions=extra_user_instructions,
     )
+    final_sql = _call_responses_api(model, temperature, full_prompt)
 
     return final_sql, full_prompt
 
 
-def combine_sql_descriptions(tool_ids, df_descriptions, execution_sequence="",
-                              extra_user_instructions="", model="gpt-4.1", temperature=0.0):
-    """
-    Create a SQL structure guide from individual tool descriptions.
-    Equivalent of description_generator.combine_tool_descriptions but SQL-focused.
-
-    Returns:
-        tuple: (sql_structure_guide, full_prompt)
-    """
-    descriptions = []
-    for tool_id in tool_ids:
-        subset = df_descriptions.loc[df_descriptions["tool_id"] == tool_id, "description"]
-        if not subset.empty:
-            descriptions.append(f"Tool {tool_id}: {subset.iloc[0]}")
-        else:
-            descriptions.append(f"Tool {tool_id}: No description available")
-
-    all_descriptions = "\n\n".join(descriptions)
-
-    if not extra_user_instructions:
-        extra_user_instructions = ""
-
-    template = """
+_SQL_GUIDE_PROMPT = PromptTemplate(
+    input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence"],
+    template="""
     You are an expert SQL data engineer creating a comprehensive SQL structure guide for converting Alteryx workflows to SQL.
     Below are technical descriptions of individual Alteryx tools that form a data processing pipeline.
 
@@ -247,52 +215,40 @@ def combine_sql_descriptions(tool_ids, df_descriptions, execution_sequence="",
     - Aggregation patterns
 
     Provide only the detailed SQL structure guide below:
+    """,
+)
+
+
+def combine_sql_descriptions(tool_ids, df_descriptions, execution_sequence="",
+                              extra_user_instructions="", model="gpt-4.1", temperature=0.0, on_text=None):
     """
+    Create a SQL structure guide from individual tool descriptions.
+    Equivalent of description_generator.combine_tool_descriptions but SQL-focused.
 
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence"],
-        template=template
-    )
+    Parameters:
+        on_text (callable): Optional callback(new_text) that streams the guide as it is generated.
 
-    sql_structure_guide = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence,
-    )
+    Returns:
+        tuple: (sql_structure_guide, full_prompt)
+    """
+    all_descriptions = _join_descriptions(tool_ids, df_descriptions)
 
-    full_prompt = prompt.format(
+    if not extra_user_instructions:
+        extra_user_instructions = ""
+
+    full_prompt = _SQL_GUIDE_PROMPT.format(
         all_descriptions=all_descriptions,
         extra_user_instructions=extra_user_instructions,
         execution_sequence=execution_sequence,
     )
+    sql_structure_guide = _generate(model, temperature, full_prompt, None, on_text)
 
     return sql_structure_guide, full_prompt
 
 
-def generate_final_sql(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="",
-                        sql_structure_guide="", model="gpt-5.1-codex", temperature=0.0):
-    """
-    Generate final SQL code following the structure guide.
-    Equivalent of description_generator.generate_final_python_code but for SQL.
-
-    Returns:
-        tuple: (final_sql, full_prompt)
-    """
-    descriptions = []
-    for tool_id in tool_ids:
-        subset = df_descriptions.loc[df_descriptions["tool_id"] == tool_id, "description"]
-        if not subset.empty:
-            descriptions.append(f"Tool {tool_id}:\n{subset.iloc[0]}")
-        else:
-            descriptions.append(f"Tool {tool_id}: No description available")
-
-    all_descriptions = "\n\n".join(descriptions)
-
-    if not extra_user_instructions:
-        extra_user_instructions = ""
-
-    template = """
+_FINAL_SQL_PROMPT = PromptTemplate(
+    input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence", "sql_structure_guide"],
+    template="""
     You are an expert SQL data engineer generating a complete SQL script from Alteryx tool descriptions.
 
     Individual tool descriptions:
@@ -314,26 +270,33 @@ def generate_final_sql(tool_ids, df_descriptions, execution_sequence="", extra_u
     7. Does NOT wrap output in markdown code fences — return only raw SQL.
 
     Provide only the complete SQL script below:
+    """,
+)
+
+
+def generate_final_sql(tool_ids, df_descriptions, execution_sequence="", extra_user_instructions="",
+                        sql_structure_guide="", model="gpt-5.1-codex", temperature=0.0, on_text=None):
     """
+    Generate final SQL code following the structure guide.
+    Equivalent of description_generator.generate_final_python_code but for SQL.
 
-    prompt = PromptTemplate(
-        input_variables=["all_descriptions", "extra_user_instructions", "execution_sequence", "sql_structure_guide"],
-        template=template
-    )
+    Parameters:
+        on_text (callable): Optional callback(new_text) that streams the SQL as it is generated.
 
-    final_sql = _call_responses_api_from_prompt_template(
-        prompt, model, temperature,
-        all_descriptions=all_descriptions,
-        extra_user_instructions=extra_user_instructions,
-        execution_sequence=execution_sequence,
-        sql_structure_guide=sql_structure_guide,
-    )
+    Returns:
+        tuple: (final_sql, full_prompt)
+    """
+    all_descriptions = _join_descriptions(tool_ids, df_descriptions, separator=":\n")
+
+    if not extra_user_instructions:
+        extra_user_instructions = ""
 
-    full_prompt = prompt.format(
+    full_prompt = _FINAL_SQL_PROMPT.format(
         all_descriptions=all_descriptions,
         extra_user_instructions=extra_user_instructions,
         execution_sequence=execution_sequence,
         sql_structure_guide=sql_structure_guide,
     )
+    final_sql = _generate(model, temperature, full_prompt, None, on_text)
 
     return final_sql, full_prompt
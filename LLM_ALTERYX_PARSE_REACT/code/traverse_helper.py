@@ -1,31 +1,40 @@
-from collections import defaultdict
+from collections import defaultdict, deque
 import pandas as pd
-import networkx as nx
 
 
 def get_execution_order(df_nodes, df_connections):
     """
     Returns a list of tool_ids in execution order based on the connections.
-    It builds a directed graph using origin and destination tool IDs from df_connections,
-    then performs a topological sort.
+    It runs a topological sort (Kahn's algorithm) over the graph of origin and
+    destination tool IDs from df_connections: a tool is emitted once every tool
+    feeding it has been, and ready tools keep the order they appear in df_nodes.
+    Tools that only appear in df_connections follow the df_nodes tools.
     """
-    G = nx.DiGraph()
-
-    # Add all nodes (tool IDs) from df_nodes
-    for tool_id in df_nodes["tool_id"]:
-        G.add_node(tool_id)
-
-    # Add edges: each edge from an origin tool to a destination tool
-    for _, row in df_connections.iterrows():
-        origin = row["origin_tool_id"]
-        destination = row["destination_tool_id"]
-        if pd.notnull(origin) and pd.notnull(destination):
-            G.add_edge(origin, destination)
-
-    try:
-        # Get a topological sort of the graph, which reflects the execution order
-        execution_order = list(nx.topological_sort(G))
-    except nx.NetworkXUnfeasible:
+    successors = defaultdict(list)
+    in_degree = {tool_id: 0 for tool_id in df_nodes["tool_id"]}
+
+    # Add edges: each edge from an origin tool to a destination tool (parallel edges count once)
+    edges = dict.fromkeys(
+        (origin, destination)
+        for origin, destination in zip(df_connections["origin_tool_id"], df_connections["destination_tool_id"])
+        if pd.notnull(origin) and pd.notnull(destination)
+    )
+    for origin, destination in edges:
+        in_degree.setdefault(origin, 0)
+        in_degree[destination] = in_degree.get(destination, 0) + 1
+        successors[origin].append(destination)
+
+    ready = deque(tool_id for tool_id, degree in in_degree.items() if degree == 0)
+    execution_order = []
+    while ready:
+        tool_id = ready.popleft()
+        execution_order.append(tool_id)
+        for destination in successors[tool_id]:
+            in_degree[destination] -= 1
+            if in_degree[destination] == 0:
+                ready.append(destination)
+
+    if len(execution_order) != len(in_degree):
         raise Exception("Cycle detected in workflow connections!")
 
     return execution_order
@@ -37,6 +46,32 @@ def adjust_order(random_tool_ids, execution_sequence):
     return sorted(random_tool_ids, key=lambda tool: sequence_lookup.get(tool, float('inf')))
 
 
+def _build_chain(u, v, adj_list, in_degree, out_degree, used_edges):
+    """Build a single chain starting from edge (u -> v), marking its edges in used_edges."""
+    chain = [u, v]
+    used_edges.add((u, v))
+    current = v
+    # Bound lookups; .get also keeps the degree dicts from growing on missing nodes.
+    get_in, get_out, get_next = in_degree.get, out_degree.get, adj_list.get
+    mark_used = used_edges.add
+
+    # Follow the chain while the current node is "linear": in_degree=1, out_degree=1
+    while get_in(current, 0) == 1 and get_out(current, 0) == 1:
+        # current has exactly one neighbor in adj_list
+        next_nodes = get_next(current)
+        if not next_nodes:
+            break
+        nxt = next_nodes[0]  # only child
+        # Mark edge as used
+        if (current, nxt) in used_edges:
+            break
+        chain.append(nxt)
+        mark_used((current, nxt))
+        current = nxt
+
+    return chain
+
+
 def parse_linear_chains(df_connections):
     """
     Parse all linear chains from a connections DataFrame.
@@ -57,54 +92,23 @@ def parse_linear_chains(df_connections):
     in_degree = defaultdict(int)
     out_degree = defaultdict(int)
 
-    # Collect all unique nodes to handle isolated cases if necessary
-    all_nodes = set(df_connections["origin_tool_id"]) | set(df_connections["destination_tool_id"])
-
     # Build graph
-    for _, row in df_connections.iterrows():
-        u = str(row["origin_tool_id"])
-        v = str(row["destination_tool_id"])
+    for origin, destination in zip(df_connections["origin_tool_id"], df_connections["destination_tool_id"]):
+        u = str(origin)
+        v = str(destination)
         adj_list[u].append(v)
         out_degree[u] += 1
         in_degree[v] += 1
 
-    # Ensure every node is represented in the dictionaries
-    for node in all_nodes:
-        adj_list[node] = adj_list[node]  # just to ensure a key is present
-        in_degree[node] = in_degree[node]
-        out_degree[node] = out_degree[node]
-
     # 2) Keep track of which edges are "used"
     used_edges = set()  # store as tuples (u, v)
 
-    # Helper function to build a single chain starting from edge (u -> v)
-    def build_chain(u, v):
-        chain = [u, v]
-        used_edges.add((u, v))
-        current = v
-
-        # Follow the chain while the current node is "linear": in_degree=1, out_degree=1
-        while in_degree[current] == 1 and out_degree[current] == 1:
-            # current has exactly one neighbor in adj_list
-            next_nodes = adj_list[current]
-            if not next_nodes:
-                break
-            nxt = next_nodes[0]  # only child
-            # Mark edge as used
-            if (current, nxt) in used_edges:
-                break
-            chain.append(nxt)
-            used_edges.add((current, nxt))
-            current = nxt
-
-        return chain
-
     # 3) Main loop: for each node u, for each neighbor v, if edge (u, v) not used => build a chain
     chains = []
     for u in adj_list:
         for v in adj_list[u]:
             if (u, v) not in used_edges:
-                chain = build_chain(u, v)
+                chain = _build_chain(u, v, adj_list, in_degree, out_degree, used_edges)
                 chains.append(chain)
 
     return chains
@@ -118,12 +122,11 @@ def get_tools_without_input(df_connections):
         df_connections (pd.DataFrame): DataFrame containing columns 'origin_tool_id' and 'destination_tool_id'.
 
     Returns:
-        list: A list of tool IDs that never appear as a destination (i.e., have no input).
+        list: A list of tool IDs that never appear as a destination (i.e., have no input),
+              in the order they first appear in df_connections.
     """
-    origin_tools = set(df_connections["origin_tool_id"])
     destination_tools = set(df_connections["destination_tool_id"])
-    tools_without_input = origin_tools - destination_tools
-    return list(tools_without_input)
+    return [tool for tool in dict.fromkeys(df_connections["origin_tool_id"]) if tool not in destination_tools]
 
 
 def get_next_tools(df_connections, tool_id):
@@ -155,17 +158,44 @@ def get_output_name(df_connections, tool_id):
     return output_names
 
 
+def build_connection_index(df_connections):
+    """
+    Index the connections by tool in a single pass, so per-tool lookups do not
+    rescan df_connections.
+
+    Parameters:
+        df_connections (pd.DataFrame): Must have columns 'origin_tool_id', 'origin_connection',
+            'destination_tool_id' and 'destination_connection'.
+
+    Returns:
+        tuple(dict, dict): (inputs_by_tool, outputs_by_tool), mapping tool_id to the same lists
+            get_input_name and get_output_name return. Tools without connections are absent.
+    """
+    inputs_by_tool = defaultdict(list)
+    outputs_by_tool = defaultdict(list)
+    for origin, origin_connection, destination, destination_connection in zip(
+        df_connections["origin_tool_id"],
+        df_connections["origin_connection"],
+        df_connections["destination_tool_id"],
+        df_connections["destination_connection"],
+    ):
+        df_name = f"df_{origin}_{origin_connection}"
+        inputs_by_tool[destination].append([df_name, destination_connection])
+        if df_name not in outputs_by_tool[origin]:
+            outputs_by_tool[origin].append(df_name)
+    return dict(inputs_by_tool), dict(outputs_by_tool)
+
+
 def get_input_name(df_connections, tool_id):
     # Filter rows where the given tool_id is the destination
     filtered = df_connections[df_connections["destination_tool_id"] == tool_id]
 
-    results = []
-    for _, row in filtered.iterrows():
-        input_df_name = f"df_{row['origin_tool_id']}_{row['origin_connection']}"
-        input_type = row["destination_connection"]
-        results.append([input_df_name, input_type])
-
-    return results
+    return [
+        [f"df_{origin}_{origin_connection}", input_type]
+        for origin, origin_connection, input_type in zip(
+            filtered["origin_tool_id"], filtered["origin_connection"], filtered["destination_connection"]
+        )
+    ]
 
 
 
@@ -201,6 +201,7 @@ export async function* streamPost<T>(
 ): AsyncGenerator<
   | { type: 'progress'; value: number }
   | { type: 'message'; text: string }
+  | { type: 'partial'; text: string }
   | { type: 'result'; data: T }
   | { type: 'error'; message: string }
   | { type: 'heartbeat' }
@@ -34,6 +34,8 @@ export interface ToolDescription {
   tool_id: string
   tool_type: string
   description: string
+  // Set when the tool could not be described; description is then empty
+  error?: string
 }
 
 // Step 1 result (from SSE final event)
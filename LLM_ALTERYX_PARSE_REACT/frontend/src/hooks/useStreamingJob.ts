@@ -14,6 +14,8 @@ export function useStreamingJob<T>() {
       body: unknown,
       callbacks: {
         onProgress?: (value: number, message: string) => void
+        // Chunks of streamed LLM output, in order
+        onPartial?: (text: string) => void
         onResult: (data: T) => void
         onError: (message: string) => void
       },
@@ -31,6 +33,8 @@ export function useStreamingJob<T>() {
             callbacks.onProgress?.(event.value, '')
           } else if (event.type === 'message') {
             callbacks.onProgress?.(NaN, event.text)
+          } else if (event.type === 'partial') {
+            callbacks.onPartial?.(event.text)
           } else if (event.type === 'result') {
             callbacks.onResult(event.data as T)
           } else if (event.type === 'error') {
@@ -2,12 +2,11 @@ import { useState } from 'react'
 import { Layers, ChevronDown, ChevronRight, CheckCircle2, Circle, AlertCircle, Download, Tag } from 'lucide-react'
 import { useAppStore, parsedToolIds } from '../store/useAppStore'
 import { useStreamingJob } from '../hooks/useStreamingJob'
-import { runStep2, runStep3 } from '../api/client'
 import { ProgressTracker } from '../components/ProgressTracker'
 import { CodeViewer } from '../components/CodeViewer'
 import { MarkdownViewer } from '../components/MarkdownViewer'
-import type { Step1Result } from '../api/types'
-import { surfaceAppError, surfaceMessageError } from '../utils/errorSupport'
+import type { Step1Result, Step2Result, Step3Result } from '../api/types'
+import { surfaceMessageError } from '../utils/errorSupport'
 
 function downloadText(content: string, filename: string) {
   const blob = new Blob([content], { type: 'text/plain' })
@@ -102,6 +101,11 @@ export function AdvancedConversion() {
   const [showPrompts, setShowPrompts] = useState(false)
 
   const { run: runStep1SSE, cancel: cancelStep1 } = useStreamingJob<Step1Result>()
+  const { run: runStep2SSE } = useStreamingJob<Step2Result>()
+  const { run: runStep3SSE } = useStreamingJob<Step3Result>()
+  // Text streamed so far while step 2 / step 3 are running
+  const [step2Partial, setStep2Partial] = useState('')
+  const [step3Partial, setStep3Partial] = useState('')
 
   const toolIds = parsedToolIds(toolIdsRaw)
   const canRun = !!upload.sessionId && !!config.api_key && toolIds.length > 0
@@ -139,64 +143,82 @@ export function AdvancedConversion() {
   const handleStep2 = async () => {
     if (!adv1.result) return
     setAdv2({ status: 'running', result: null, error: null })
-    try {
-      const res = await runStep2(
-        upload.sessionId!,
+    setStep2Partial('')
+    await runStep2SSE(
+      '/api/convert/advanced/step2',
+      {
+        session_id: upload.sessionId,
         config,
-        toolIds,
-        extraInstructions,
-        adv1.result.descriptions,
-        adv1.result.execution_sequence,
-      )
-      setAdv2({ status: 'done', result: res })
-    } catch (err) {
-      const msg = await surfaceAppError(err, {
-        title: 'Advanced Step 2 Failed',
-        scope: 'advanced-convert-step2',
-        action: 'Build workflow structure guide',
-      })
-      setAdv2({ status: 'error', error: msg })
-    }
+        tool_ids: toolIds,
+        extra_instructions: extraInstructions,
+        tool_descriptions: adv1.result.descriptions,
+        execution_sequence: adv1.result.execution_sequence,
+        stream: true,
+      },
+      {
+        onPartial: (text) => setStep2Partial((prev) => prev + text),
+        onResult: (data) => setAdv2({ status: 'done', result: data }),
+        onError: (msg) => {
+          setAdv2({ status: 'error', error: msg })
+          void surfaceMessageError(msg, {
+            title: 'Advanced Step 2 Failed',
+            scope: 'advanced-convert-step2',
+            action: 'Build workflow structure guide',
+          })
+        },
+      },
+    )
   }
 
   // ---- Step 3 ----
   const handleStep3 = async () => {
     if (!adv1.result || !adv2.result) return
+    const step1 = adv1.result
+    const step2 = adv2.result
     setAdv3({ status: 'running', result: null, error: null })
-    try {
-      const res = await runStep3(
-        upload.sessionId!,
+    setStep3Partial('')
+    await runStep3SSE(
+      '/api/convert/advanced/step3',
+      {
+        session_id: upload.sessionId,
         config,
-        toolIds,
-        extraInstructions,
-        adv1.result.descriptions,
-        adv1.result.execution_sequence,
-        adv2.result.workflow_description,
-      )
-      setAdv3({ status: 'done', result: res })
-      // Save to history
-      addHistory({
-        id: crypto.randomUUID(),
-        timestamp: new Date().toISOString(),
-        type: 'advanced',
-        tool_ids: toolIds.join(', '),
+        tool_ids: toolIds,
         extra_instructions: extraInstructions,
-        model_info: `Gen: ${config.code_generate_model} | Reasoning: ${config.reasoning_model} | Combine: ${config.code_combine_model}`,
-        temperature: config.temperature,
-        tool_descriptions: adv1.result.descriptions,
-        workflow_description: adv2.result.workflow_description,
-        workflow_prompt: adv2.result.workflow_prompt,
-        final_python_code: res.final_python_code,
-        final_prompt: res.final_prompt,
-      })
-    } catch (err) {
-      const msg = await surfaceAppError(err, {
-        title: 'Advanced Step 3 Failed',
-        scope: 'advanced-convert-step3',
-        action: 'Generate final Python workflow',
-      })
-      setAdv3({ status: 'error', error: msg })
-    }
+        tool_descriptions: step1.descriptions,
+        execution_sequence: step1.execution_sequence,
+        workflow_description: step2.workflow_description,
+        stream: true,
+      },
+      {
+        onPartial: (text) => setStep3Partial((prev) => prev + text),
+        onResult: (res) => {
+          setAdv3({ status: 'done', result: res })
+          // Save to history
+          addHistory({
+            id: crypto.randomUUID(),
+            timestamp: new Date().toISOString(),
+            type: 'advanced',
+            tool_ids: toolIds.join(', '),
+            extra_instructions: extraInstructions,
+            model_info: `Gen: ${config.code_generate_model} | Reasoning: ${config.reasoning_model} | Combine: ${config.code_combine_model}`,
+            temperature: config.temperature,
+            tool_descriptions: step1.descriptions,
+            workflow_description: step2.workflow_description,
+            workflow_prompt: step2.workflow_prompt,
+            final_python_code: res.final_python_code,
+            final_prompt: res.final_prompt,
+          })
+        },
+        onError: (msg) => {
+          setAdv3({ status: 'error', error: msg })
+          void surfaceMessageError(msg, {
+            title: 'Advanced Step 3 Failed',
+            scope: 'advanced-convert-step3',
+            action: 'Generate final Python workflow',
+          })
+        },
+      },
+    )
   }
 
   const buildCombinedDownload = () => {
@@ -308,7 +330,9 @@ ${adv3.result?.final_prompt ?? ''}
                       <span className="text-xs font-semibold text-primary">Tool {d.tool_id}</span>
                       <span className="text-xs text-muted">({d.tool_type})</span>
                     </div>
-                    <DescriptionCard description={d.description} />
+                    {d.error
+                      ? <p className="text-xs text-error">{d.error}</p>
+                      : <DescriptionCard description={d.description} />}
                   </div>
                 ))}
               </div>
@@ -350,6 +374,10 @@ ${adv3.result?.final_prompt ?? ''}
           <p className="text-xs text-error mb-2">{adv2.error}</p>
         )}
 
+        {adv2.status === 'running' && step2Partial && (
+          <MarkdownViewer content={step2Partial} maxHeight="350px" />
+        )}
+
         {adv2.status === 'done' && adv2.result && (
           <div className="fade-in">
             <div className="flex items-center justify-between mb-2">
@@ -390,6 +418,10 @@ ${adv3.result?.final_prompt ?? ''}
           <p className="text-xs text-error mb-2">{adv3.error}</p>
         )}
 
+        {adv3.status === 'running' && step3Partial && (
+          <CodeViewer code={step3Partial} language="python" />
+        )}
+
         {adv3.status === 'done' && adv3.result && (
           <div className="space-y-3 fade-in">
             <div className="flex items-center gap-2 text-success text-xs font-medium">
@@ -2,12 +2,11 @@ import { useState } from 'react'
 import { Database, ChevronDown, ChevronRight, CheckCircle2, Circle, AlertCircle, Download, Tag } from 'lucide-react'
 import { useAppStore, parsedToolIds } from '../store/useAppStore'
 import { useStreamingJob } from '../hooks/useStreamingJob'
-import { runSqlStep2, runSqlStep3 } from '../api/client'
 import { ProgressTracker } from '../components/ProgressTracker'
 import { CodeViewer } from '../components/CodeViewer'
 import { MarkdownViewer } from '../components/MarkdownViewer'
 import type { Step1Result, SqlStep2Result, SqlStep3Result } from '../api/types'
-import { surfaceAppError, surfaceMessageError } from '../utils/errorSupport'
+import { surfaceMessageError } from '../utils/errorSupport'
 
 function downloadText(content: string, filename: string) {
   const blob = new Blob([content], { type: 'text/plain' })
@@ -109,6 +108,11 @@ export function SqlAdvancedConversion() {
   const [showPrompts, setShowPrompts] = useState(false)
 
   const { run: runStep1SSE, cancel: cancelStep1 } = useStreamingJob<Step1Result>()
+  const { run: runStep2SSE } = useStreamingJob<SqlStep2Result>()
+  const { run: runStep3SSE } = useStreamingJob<SqlStep3Result>()
+  // Text streamed so far while step 2 / step 3 are running
+  const [step2Partial, setStep2Partial] = useState('')
+  const [step3Partial, setStep3Partial] = useState('')
 
   const toolIds = parsedToolIds(toolIdsRaw)
   const canRun = !!upload.sessionId && !!config.api_key && toolIds.length > 0
@@ -159,26 +163,35 @@ export function SqlAdvancedConversion() {
     setStep2Status('running')
     setStep2Result(null)
     setStep2Error(null)
-    try {
-      const res = await runSqlStep2(
-        upload.sessionId!,
+    setStep2Partial('')
+    await runStep2SSE(
+      '/api/convert/sql/advanced/step2',
+      {
+        session_id: upload.sessionId,
         config,
-        toolIds,
-        extraInstructions,
-        step1Result.descriptions,
-        step1Result.execution_sequence,
-      )
-      setStep2Status('done')
-      setStep2Result(res)
-    } catch (err) {
-      const msg = await surfaceAppError(err, {
-        title: 'SQL Advanced Step 2 Failed',
-        scope: 'sql-advanced-step2',
-        action: 'Build SQL structure guide',
-      })
-      setStep2Status('error')
-      setStep2Error(msg)
-    }
+        tool_ids: toolIds,
+        extra_instructions: extraInstructions,
+        tool_descriptions: step1Result.descriptions,
+        execution_sequence: step1Result.execution_sequence,
+        stream: true,
+      },
+      {
+        onPartial: (text) => setStep2Partial((prev) => prev + text),
+        onResult: (res) => {
+          setStep2Status('done')
+          setStep2Result(res)
+        },
+        onError: (msg) => {
+          setStep2Status('error')
+          setStep2Error(msg)
+          void surfaceMessageError(msg, {
+            title: 'SQL Advanced Step 2 Failed',
+            scope: 'sql-advanced-step2',
+            action: 'Build SQL structure guide',
+          })
+        },
+      },
+    )
   }
 
   // ---- Step 3: Final SQL ----
@@ -187,27 +200,36 @@ export function SqlAdvancedConversion() {
     setStep3Status('running')
     setStep3Result(null)
     setStep3Error(null)
-    try {
-      const res = await runSqlStep3(
-        upload.sessionId!,
+    setStep3Partial('')
+    await runStep3SSE(
+      '/api/convert/sql/advanced/step3',
+      {
+        session_id: upload.sessionId,
         config,
-        toolIds,
-        extraInstructions,
-        step1Result.descriptions,
-        step1Result.execution_sequence,
-        step2Result.sql_structure_guide,
-      )
-      setStep3Status('done')
-      setStep3Result(res)
-    } catch (err) {
-      const msg = await surfaceAppError(err, {
-        title: 'SQL Advanced Step 3 Failed',
-        scope: 'sql-advanced-step3',
-        action: 'Generate final SQL workflow',
-      })
-      setStep3Status('error')
-      setStep3Error(msg)
-    }
+        tool_ids: toolIds,
+        extra_instructions: extraInstructions,
+        tool_descriptions: step1Result.descriptions,
+        execution_sequence: step1Result.execution_sequence,
+        sql_structure_guide: step2Result.sql_structure_guide,
+        stream: true,
+      },
+      {
+        onPartial: (text) => setStep3Partial((prev) => prev + text),
+        onResult: (res) => {
+          setStep3Status('done')
+          setStep3Result(res)
+        },
+        onError: (msg) => {
+          setStep3Status('error')
+          setStep3Error(msg)
+          void surfaceMessageError(msg, {
+            title: 'SQL Advanced Step 3 Failed',
+            scope: 'sql-advanced-step3',
+            action: 'Generate final SQL workflow',
+          })
+        },
+      },
+    )
   }
 
   const buildCombinedDownload = () => {
@@ -319,7 +341,9 @@ ${step3Result?.final_prompt ?? ''}
                       <span className="text-xs font-semibold text-primary">Tool {d.tool_id}</span>
                       <span className="text-xs text-muted">({d.tool_type})</span>
                     </div>
-                    <DescriptionCard description={d.description} />
+                    {d.error
+                      ? <p className="text-xs text-error">{d.error}</p>
+                      : <DescriptionCard description={d.description} />}
                   </div>
                 ))}
               </div>
@@ -360,6 +384,10 @@ ${step3Result?.final_prompt ?? ''}
 
         {step2Status === 'error' && <p className="text-xs text-error mb-2">{step2Error}</p>}
 
+        {step2Status === 'running' && step2Partial && (
+          <MarkdownViewer content={step2Partial} maxHeight="350px" />
+        )}
+
         {step2Status === 'done' && step2Result && (
           <div className="fade-in">
             <div className="flex items-center justify-between mb-2">
@@ -401,6 +429,10 @@ ${step3Result?.final_prompt ?? ''}
 
         {step3Status === 'error' && <p className="text-xs text-error mb-2">{step3Error}</p>}
 
+        {step3Status === 'running' && step3Partial && (
+          <CodeViewer code={step3Partial} language="sql" />
+        )}
+
         {step3Status === 'done' && step3Result && (
           <div className="space-y-3 fade-in">
             <div className="flex items-center gap-2 text-success text-xs font-medium">
@@ -0,0 +1,85 @@
+"""
+Normalizes the tool guide texts in code/tool_contexts/ so no work is left for runtime.
+
+Each .txt file is dedented and stripped of surrounding blank lines, then written back
+with a single trailing newline. Structured .yaml guides are checked to parse. Run after
+editing any guide:
+    python scripts/precompile_contexts.py
+
+Every run also rewrites manifest.toml, the tool type -> file index the loader reads
+instead of scanning the directory.
+
+Packaging: compress the bundled copy (never the source tree) into .txt.gz / .yaml.gz files,
+which code/ToolContextDictionary.py decompresses lazily on first access:
+    python scripts/precompile_contexts.py --gzip --dir dist-backend/api/_internal/code/tool_contexts
+"""
+
+import argparse
+import gzip
+import sys
+import textwrap
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+CONTEXT_DIR = ROOT / "code" / "tool_contexts"
+MANIFEST = "manifest.toml"
+SUFFIXES = (".txt.gz", ".yaml.gz", ".txt", ".yaml")
+
+
+def normalize(text):
+    return textwrap.dedent(text).strip() + "\n"
+
+
+def write_manifest(directory):
+    # Same precedence as the loader: later suffixes override earlier ones.
+    index = {}
+    for suffix in SUFFIXES:
+        for path in sorted(directory.glob(f"*{suffix}")):
+            index[path.name[:-len(suffix)]] = path.name
+    lines = ["# Generated by scripts/precompile_contexts.py — do not edit by hand.", ""]
+    for tool, name in sorted(index.items()):
+        lines += [f'[tools."{tool}"]', f'file = "{name}"', ""]
+    (directory / MANIFEST).write_text("\n".join(lines), encoding="utf-8")
+    return len(index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", type=Path, default=CONTEXT_DIR, help="tool_contexts directory to process")
+    parser.add_argument("--gzip", action="store_true", help="replace each guide file with a .gz copy (for packaged builds)")
+    args = parser.parse_args(argv)
+
+    if not args.dir.is_dir():
+        print(f"[precompile] Missing directory: {args.dir}", file=sys.stderr)
+        return 1
+
+    changed = 0
+    paths = sorted([*args.dir.glob("*.txt"), *args.dir.glob("*.yaml")])
+    for path in paths:
+        original = path.read_text(encoding="utf-8")
+        if path.suffix == ".yaml":
+            try:
+                yaml.safe_load(original)
+            except yaml.YAMLError as e:
+                print(f"[precompile] Invalid YAML in {path.name}: {e}", file=sys.stderr)
+                return 1
+            normalized = original.strip() + "\n"
+        else:
+            normalized = normalize(original)
+        if args.gzip:
+            path.with_name(path.name + ".gz").write_bytes(gzip.compress(normalized.encode("utf-8"), 9))
+            path.unlink()
+            changed += 1
+        elif normalized != original:
+            path.write_text(normalized, encoding="utf-8")
+            changed += 1
+            print(f"[precompile] normalized {path.name}")
+    print(f"[precompile] {changed} file(s) {'compressed' if args.gzip else 'updated'} in {args.dir}")
+    print(f"[precompile] {write_manifest(args.dir)} tool(s) listed in {MANIFEST}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())